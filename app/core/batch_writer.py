@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, IntegrityError, InterfaceError, OperationalError
+
+from app.core.database import AsyncSessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+
+def is_transient(exc: Exception) -> bool:
+    if isinstance(exc, (OperationalError, InterfaceError, OSError, TimeoutError)):
+        return True
+
+    return isinstance(exc, DBAPIError) and exc.connection_invalidated
+
+
+class BatchWriter:
+    """Inserts queued rows in batches of `batch_size` or every `flush_interval`
+    seconds, retrying transient failures."""
+
+    def __init__(
+        self,
+        model,
+        batch_size: int,
+        flush_interval: float,
+        max_queue: int,
+        retries: int = 3,
+        retry_backoff: float = 0.5,
+    ):
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.queue: asyncio.Queue[dict | None] = asyncio.Queue(maxsize=max_queue)
+        self.task: asyncio.Task | None = None
+        self.stopping = False
+        self.written = 0
+        self.retried = 0
+        self.dropped = 0
+
+    def enqueue(self, row: dict):
+        try:
+            self.queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.error("%s queue is full, dropping row", self.model.__tablename__)
+
+    async def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+
+        # The loop exits once the queue is drained. The sentinel only wakes it
+        # when idle, a full queue has no room for it and keeps the loop busy
+        self.stopping = True
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+        await self.task
+        self.task = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+
+        while not (self.stopping and self.queue.empty()):
+            row = await self.queue.get()
+            if row is None:
+                continue
+
+            batch = [row]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                # Stopping with nothing left, no sentinel may be coming
+                if self.stopping and self.queue.empty():
+                    break
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self.queue.get(), timeout)
+                except TimeoutError:
+                    break
+                if row is None:
+                    break
+                batch.append(row)
+
+            await self.write(batch)
+
+    async def write(self, batch: list[dict]):
+        for attempt in range(self.retries + 1):
+            try:
+                async with AsyncSessionLocal() as db, db.begin():
+                    await db.execute(insert(self.model), batch)
+                self.written += len(batch)
+                return
+            except IntegrityError:
+                # A referenced row was deleted in the meantime, save the rest
+                for row in batch:
+                    await self.write_one(row)
+                return
+            except Exception as exc:
+                if attempt == self.retries or not is_transient(exc):
+                    self.dropped += len(batch)
+                    logger.exception("Failed to write %d rows", len(batch))
+                    return
+
+                self.retried += 1
+                logger.warning(
+                    "Writing %d rows failed, retrying", len(batch), exc_info=exc
+                )
+                await asyncio.sleep(self.retry_backoff * 2**attempt)
+
+    async def write_one(self, row: dict):
+        try:
+            async with AsyncSessionLocal() as db, db.begin():
+                await db.execute(insert(self.model), [row])
+            self.written += 1
+        except Exception:
+            self.dropped += 1
+            logger.exception("Failed to write row to %s", self.model.__tablename__)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize(),
+            "written": self.written,
+            "retried": self.retried,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,220 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from app.core.settings import settings
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # redis is optional, only needed for RESPONSE_CACHE_BACKEND="redis"
+    redis = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """In-process LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class MemoryBackend:
+    """Per-worker backend, each worker only sees its own invalidations."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> bytes | None:
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: bytes):
+        self.cache.set(key, value)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.cache.delete(key)
+
+    async def clear(self):
+        self.cache.clear()
+
+    async def close(self):
+        pass
+
+
+class RedisBackend:
+    """Backend shared by all workers through any Redis-protocol server."""
+
+    def __init__(self, url: str, ttl: float, prefix: str = "blog-api:"):
+        if redis is None:
+            raise RuntimeError(
+                'RESPONSE_CACHE_BACKEND="redis" requires the redis package'
+            )
+
+        self.client = redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes):
+        await self.client.set(self.prefix + key, value, ex=int(self.ttl))
+
+    async def delete(self, *keys: str):
+        await self.client.delete(*(self.prefix + key for key in keys))
+
+    async def clear(self):
+        keys = [key async for key in self.client.scan_iter(match=self.prefix + "*")]
+        if keys:
+            await self.client.delete(*keys)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class ResponseCache:
+    """Caches rendered response bodies, served only for the ETag they were
+    rendered for. Backend errors count as misses."""
+
+    def __init__(self, backend: MemoryBackend | RedisBackend | None):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    async def get(self, key: str, etag: str) -> bytes | None:
+        if self.backend is None:
+            return None
+
+        try:
+            value = await self.backend.get(key)
+        except Exception:
+            self.errors += 1
+            logger.exception("Response cache get failed")
+            return None
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        # The ETag goes first on its own line, JSON bodies never contain a
+        # raw newline
+        stored_etag, body = value.split(b"\n", 1)
+        if stored_etag.decode() != etag:
+            self.stale += 1
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return body
+
+    async def set(self, key: str, etag: str, body: bytes):
+        if self.backend is None:
+            return
+
+        try:
+            await self.backend.set(key, etag.encode() + b"\n" + body)
+        except Exception:
+            self.errors += 1
+            logger.exception("Response cache set failed")
+
+    async def invalidate(self, *keys: str):
+        if self.backend is None:
+            return
+
+        self.invalidations += len(keys)
+        try:
+            await self.backend.delete(*keys)
+        except Exception:
+            self.errors += 1
+            logger.exception("Response cache invalidation failed")
+
+    async def clear(self):
+        if self.backend is None:
+            return
+
+        self.invalidations += 1
+        try:
+            await self.backend.clear()
+        except Exception:
+            self.errors += 1
+            logger.exception("Response cache clear failed")
+
+    async def close(self):
+        if self.backend is not None:
+            await self.backend.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": settings.RESPONSE_CACHE_BACKEND,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+            "stale": self.stale,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+
+
+def create_response_cache() -> ResponseCache:
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        return ResponseCache(
+            MemoryBackend(
+                maxsize=settings.RESPONSE_CACHE_SIZE,
+                ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+            )
+        )
+
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        if settings.RESPONSE_CACHE_REDIS_URL is None:
+            raise RuntimeError(
+                'RESPONSE_CACHE_BACKEND="redis" requires RESPONSE_CACHE_REDIS_URL'
+            )
+        return ResponseCache(
+            RedisBackend(
+                settings.RESPONSE_CACHE_REDIS_URL.get_secret_value(),
+                ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+            )
+        )
+
+    return ResponseCache(None)
+
+
+response_cache = create_response_cache()
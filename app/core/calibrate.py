@@ -0,0 +1,68 @@
+"""Pick argon2 parameters for this host.
+
+Run with `python -m app.core.calibrate --target-ms 250 --max-memory-mib 64`
+and copy the printed values into `.env`. Memory is kept as high as the budget
+allows and the time cost is raised until a hash takes about `target-ms`.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+
+MIN_MEMORY_KIB = 19 * 1024
+SAMPLES = 5
+
+
+def measure(time_cost: int, memory_cost: int, parallelism: int) -> float:
+    hasher = Argon2Hasher(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+    timings = []
+    for _ in range(SAMPLES):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, max_memory_kib: int, parallelism: int):
+    memory_cost = max_memory_kib
+
+    # Above the target even with a single pass, so trade memory for time
+    while (
+        single_pass_ms := measure(1, memory_cost, parallelism)
+    ) > target_ms and memory_cost // 2 >= MIN_MEMORY_KIB:
+        memory_cost //= 2
+
+    time_cost = max(1, int(target_ms // single_pass_ms))
+    elapsed_ms = measure(time_cost, memory_cost, parallelism)
+    while elapsed_ms > target_ms and time_cost > 1:
+        time_cost -= 1
+        elapsed_ms = measure(time_cost, memory_cost, parallelism)
+
+    return time_cost, memory_cost, elapsed_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--max-memory-mib", type=int, default=64)
+    parser.add_argument("--parallelism", type=int, default=min(os.cpu_count() or 1, 4))
+    args = parser.parse_args()
+
+    time_cost, memory_cost, elapsed_ms = calibrate(
+        args.target_ms, args.max_memory_mib * 1024, args.parallelism
+    )
+
+    print(f"# {elapsed_ms:.1f} ms per hash on this host")
+    print(f"ARGON2_TIME_COST = {time_cost}")
+    print(f"ARGON2_MEMORY_COST = {memory_cost}")
+    print(f"ARGON2_PARALLELISM = {args.parallelism}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,169 @@
+import inspect
+import time
+from sqlalchemy.exc import TimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.settings import settings
 
 
-engine = create_async_engine(settings.DATABASE_URL.get_secret_value(), echo=True)
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that also records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def connect(self):
+        started_at = time.perf_counter()
+        try:
+            return super().connect()
+        except TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            wait = time.perf_counter() - started_at
+            self.checkouts += 1
+            self.total_wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            # QueuePool counts down from -pool_size until the pool is full
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": (
+                self.total_wait_seconds / self.checkouts * 1000
+                if self.checkouts
+                else 0.0
+            ),
+            "max_wait_ms": self.max_wait_seconds * 1000,
+        }
+
+
+def create_engine_from_settings(url: str):
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            # SQLAlchemy keeps its own prepared statement cache on top of asyncpg's
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "command_timeout": settings.DB_COMMAND_TIMEOUT,
+        },
+    )
+
+
+engine = create_engine_from_settings(settings.DATABASE_URL.get_secret_value())
+
+# Without a replica configured, reads simply go to the primary
+read_engine = (
+    create_engine_from_settings(settings.DATABASE_READ_URL.get_secret_value())
+    if settings.DATABASE_READ_URL
+    else engine
+)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
 
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+READ_PRIMARY_COOKIE = "read_primary"
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
 
 class Base(DeclarativeBase):
     pass
 
 
 async def get_db():
+    # Unit of work: the whole request runs in one transaction that is committed
+    # once, so routes must depend on this with scope="function" for the commit
+    # to happen before the response is sent
     async with AsyncSessionLocal() as db:
+        async with db.begin():
+            yield db
+
+        for callback, args in db.info.pop("on_commit", []):
+            result = callback(*args)
+            if inspect.isawaitable(result):
+                await result
+
+
+def on_commit(db: AsyncSession, callback, *args):
+    """Run `callback(*args)` once the request transaction has committed.
+
+    The callback may be a coroutine function, it is awaited in that case.
+    """
+    db.info.setdefault("on_commit", []).append((callback, args))
+
+
+async def use_snapshot(db: AsyncSession):
+    """Run the rest of the session's transaction on a single snapshot.
+
+    Has to be called before the session's first query. Every statement after
+    it sees the database as of that first query, so values read by separate
+    statements always belong together.
+    """
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+
+async def get_read_db(request: Request):
+    # Clients that just wrote something are pinned to the primary for a short
+    # while so they never read an older state from a lagging replica
+    read_primary = request.cookies.get(READ_PRIMARY_COOKIE) or request.headers.get(
+        READ_PRIMARY_HEADER
+    )
+    session_factory = AsyncSessionLocal if read_primary else ReadSessionLocal
+
+    async with session_factory() as db:
         yield db
 
 
+class ReadYourWritesMiddleware:
+    """Sets the read_primary cookie on every successful write request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{READ_PRIMARY_COOKIE}=1; "
+                    f"Max-Age={settings.READ_YOUR_WRITES_SECONDS}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
 from app import models
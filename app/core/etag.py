@@ -0,0 +1,35 @@
+import hashlib
+from fastapi import Request, Response, status
+
+
+# Clients may keep the body but have to revalidate it on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    # Built from row versions and timestamps, never from the serialized body
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    if header.strip() == "*":
+        return True
+
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_etag(response, etag)
+    return response
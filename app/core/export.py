@@ -0,0 +1,57 @@
+import csv
+import io
+from typing import Any, AsyncIterator, Callable, Literal, Sequence
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+async def stream_partitions(
+    statement: Select, db: AsyncSession, fetch_size: int
+) -> AsyncIterator[Sequence[Row]]:
+    # Server-side cursor, only `fetch_size` rows are held in memory at a time
+    result = await db.stream(statement.execution_options(yield_per=fetch_size))
+    async for rows in result.partitions():
+        yield rows
+
+
+async def ndjson_chunks(
+    partitions: AsyncIterator[Sequence[Any]], serialize: Callable[[Any], str]
+) -> AsyncIterator[bytes]:
+    async for rows in partitions:
+        yield "".join(serialize(row) + "\n" for row in rows).encode()
+
+
+async def csv_chunks(
+    partitions: AsyncIterator[Sequence[Any]],
+    header: Sequence[str],
+    flatten: Callable[[Any], Sequence[Any]],
+) -> AsyncIterator[bytes]:
+    # One buffer reused for every chunk, it never holds more than a partition
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+
+    async for rows in partitions:
+        writer.writerows(flatten(row) for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def export_response(
+    chunks: AsyncIterator[bytes], format: ExportFormat, filename: str
+) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
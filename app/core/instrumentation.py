@@ -0,0 +1,138 @@
+import logging
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class RequestSQLStats:
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.seen: Counter[str] = Counter()
+
+    def repeated(self) -> dict[str, int]:
+        # The same statement text run over and over in one request is the
+        # signature of an N+1 lazy load or a query inside a loop
+        return {
+            statement: count
+            for statement, count in self.seen.items()
+            if count >= settings.SQL_REPEAT_THRESHOLD
+        }
+
+
+current_sql_stats: ContextVar[RequestSQLStats | None] = ContextVar(
+    "current_sql_stats", default=None
+)
+
+route_sql_stats: defaultdict[str, dict] = defaultdict(
+    lambda: {
+        "requests": 0,
+        "statements": 0,
+        "max_statements": 0,
+        "db_ms": 0.0,
+        "max_db_ms": 0.0,
+        "repeated_statement_requests": 0,
+    }
+)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.query_started_at = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_sql_stats.get()
+    if stats is None:
+        return
+
+    stats.statements += 1
+    stats.db_seconds += time.perf_counter() - context.query_started_at
+    stats.seen[statement] += 1
+
+
+def instrument_engine(engine: AsyncEngine):
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+
+def get_sql_stats() -> dict:
+    return dict(sorted(route_sql_stats.items(), key=lambda item: -item[1]["db_ms"]))
+
+
+def route_name(scope: Scope) -> str:
+    # Set by routing once a route matched, its path is the template so
+    # /api/posts/<uuid> is grouped as one route
+    route = scope.get("route")
+    if route is None:
+        return f"{scope['method']} <unmatched>"
+
+    # Newer FastAPI hands over the route of an included router without its
+    # prefix, take the segments the template does not cover from the request
+    depth = route.path.count("/")
+    prefix = scope["path"].rsplit("/", depth)[0] if depth else scope["path"]
+    return f"{scope['method']} {prefix}{route.path}"
+
+
+def record_request(scope: Scope, stats: RequestSQLStats):
+    db_ms = stats.db_seconds * 1000
+    route = route_sql_stats[route_name(scope)]
+    route["requests"] += 1
+    route["statements"] += stats.statements
+    route["max_statements"] = max(route["max_statements"], stats.statements)
+    route["db_ms"] += db_ms
+    route["max_db_ms"] = max(route["max_db_ms"], db_ms)
+
+    repeated = stats.repeated()
+    if repeated:
+        route["repeated_statement_requests"] += 1
+        for statement, count in repeated.items():
+            logger.warning(
+                "Possible N+1 on %s, statement ran %d times: %s",
+                route_name(scope),
+                count,
+                statement,
+            )
+
+
+class SQLInstrumentationMiddleware:
+    """Counts statements and DB time per request and reports them in a
+    Server-Timing header."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSQLStats()
+        token = current_sql_stats.set(stats)
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                db_ms = stats.db_seconds * 1000
+                timing = f'db;dur={db_ms:.1f};desc="{stats.statements} queries"'
+
+                repeated = len(stats.repeated())
+                if repeated:
+                    timing += f', dbrepeat;desc="{repeated} repeated statements"'
+
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timing)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_sql_stats.reset(token)
+            record_request(scope, stats)
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal, on_commit
+from app.models.job import Job, JobStatus
+
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict[str, Any], AsyncSession], Awaitable[None]]
+
+
+class JobQueue:
+    """Durable job queue on the jobs table, claimed with SKIP LOCKED and
+    retried with backoff until `max_attempts`."""
+
+    def __init__(
+        self,
+        workers: int,
+        poll_interval: float,
+        max_attempts: int,
+        backoff: float,
+        max_backoff: float,
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.handlers: dict[str, JobHandler] = {}
+        self.tasks: list[asyncio.Task] = []
+        self.wakeup = asyncio.Event()
+        self.counts: Counter[str] = Counter()
+
+    def handler(self, kind: str):
+        def register(fn: JobHandler) -> JobHandler:
+            self.handlers[kind] = fn
+            return fn
+
+        return register
+
+    def enqueue(
+        self,
+        db: AsyncSession,
+        kind: str,
+        payload: dict[str, Any],
+        delay: float = 0,
+        max_attempts: int | None = None,
+    ):
+        job = Job(
+            kind=kind,
+            payload=payload,
+            max_attempts=max_attempts or self.max_attempts,
+        )
+        if delay:
+            job.run_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+        db.add(job)
+
+        # Local workers pick it up right away instead of at their next poll
+        on_commit(db, self.wakeup.set)
+
+    async def start(self, workers: int | None = None):
+        for _ in range(self.workers if workers is None else workers):
+            self.tasks.append(asyncio.create_task(self.run()))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def run(self):
+        while True:
+            try:
+                worked = await self.work_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job worker iteration failed")
+                worked = False
+
+            if worked:
+                continue
+
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.poll_interval)
+            except TimeoutError:
+                pass
+
+    async def work_once(self) -> bool:
+        if not self.handlers:
+            return False
+
+        async with AsyncSessionLocal() as db, db.begin():
+            # Kinds this process has no handler for are left to processes that
+            # do, like a newer version during a rolling deploy
+            result = await db.execute(
+                select(Job)
+                .where(
+                    Job.status == JobStatus.QUEUED,
+                    Job.run_at <= func.now(),
+                    Job.kind.in_(self.handlers),
+                )
+                .order_by(Job.run_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            job = result.scalars().first()
+            if job is None:
+                return False
+
+            handler = self.handlers[job.kind]
+            try:
+                # A savepoint, so a failed handler leaves nothing behind but
+                # the job can still be rescheduled in this transaction
+                async with db.begin_nested():
+                    await handler(job.payload, db)
+            except Exception as exc:
+                await self.fail(job, exc, db)
+            else:
+                await db.execute(delete(Job).where(Job.id == job.id))
+                self.counts["done"] += 1
+
+        return True
+
+    async def fail(self, job: Job, exc: Exception, db: AsyncSession):
+        attempts = job.attempts + 1
+        values: dict[str, Any] = {"attempts": attempts, "last_error": repr(exc)}
+
+        if attempts >= job.max_attempts:
+            values["status"] = JobStatus.FAILED
+            self.counts["failed"] += 1
+            logger.error("Job %s (%s) failed for good", job.id, job.kind, exc_info=exc)
+        else:
+            delay = min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+            values["run_at"] = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            self.counts["retried"] += 1
+            logger.warning(
+                "Job %s (%s) failed, retrying in %.1fs", job.id, job.kind, delay
+            )
+
+        await db.execute(
+            update(Job)
+            .where(Job.id == job.id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+    def stats(self) -> dict:
+        return {
+            "workers": sum(not task.done() for task in self.tasks),
+            "handlers": sorted(self.handlers),
+            "done": self.counts["done"],
+            "retried": self.counts["retried"],
+            "failed": self.counts["failed"],
+        }
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+import asyncpg
+from sqlalchemy import make_url
+
+from app.core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class PgListener:
+    """Fans Postgres NOTIFY payloads out to subscribers by their `key` field,
+    over one LISTEN connection per worker."""
+
+    def __init__(self, channel: str, key: str, queue_size: int = 100):
+        self.channel = channel
+        self.key = key
+        self.queue_size = queue_size
+        self.subscribers: defaultdict[str, set[asyncio.Queue]] = defaultdict(set)
+        self.task: asyncio.Task | None = None
+
+    def subscribe(self, key) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers[str(key)].add(queue)
+        return queue
+
+    def unsubscribe(self, key, queue: asyncio.Queue):
+        queues = self.subscribers.get(str(key))
+        if queues is None:
+            return
+
+        queues.discard(queue)
+        if not queues:
+            del self.subscribers[str(key)]
+
+    def dispatch(self, connection, pid, channel, payload: str):
+        data = json.loads(payload)
+        for queue in self.subscribers.get(str(data.get(self.key)), ()):
+            if queue.full():
+                # A slow client loses its oldest event instead of stalling others
+                queue.get_nowait()
+            queue.put_nowait(data)
+
+    async def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def run(self):
+        dsn = (
+            make_url(settings.DATABASE_URL.get_secret_value())
+            .set(drivername="postgresql")
+            .render_as_string(hide_password=False)
+        )
+        backoff = 1
+
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(self.channel, self.dispatch)
+                backoff = 1
+
+                await closed.wait()
+                logger.warning("LISTEN connection for %s was closed", self.channel)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("LISTEN on %s failed", self.channel)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def stats(self) -> dict:
+        return {
+            "listening": self.task is not None and not self.task.done(),
+            "subscribed_keys": len(self.subscribers),
+            "subscribers": sum(len(queues) for queues in self.subscribers.values()),
+        }
@@ -0,0 +1,54 @@
+import base64
+import binascii
+import json
+from collections.abc import Mapping
+from datetime import datetime
+from uuid import UUID
+from fastapi import HTTPException, status
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_COMMENT_PREVIEW = 20
+
+
+def encode_cursor(sort_value: datetime | float, id: UUID) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+
+    raw = json.dumps([sort_value, str(id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        date_created, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(date_created), UUID(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, UUID]:
+    try:
+        rank, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), UUID(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def paginate(rows, limit: int, sort_key: str = "date_created") -> dict:
+    # Repositories fetch limit + 1 rows, the extra one only signals a next page
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        if isinstance(last, Mapping):
+            next_cursor = encode_cursor(last[sort_key], last["id"])
+        else:
+            next_cursor = encode_cursor(getattr(last, sort_key), last.id)
+
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Awaitable, Callable, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+PurgeStep = Callable[[int, AsyncSession], Awaitable[int]]
+
+
+class Purger:
+    """Removes soft-deleted rows in the background, `batch_size` rows per
+    transaction with a `pause` between batches."""
+
+    def __init__(
+        self,
+        steps: Sequence[PurgeStep],
+        batch_size: int,
+        pause: float,
+        interval: float,
+    ):
+        self.steps = steps
+        self.batch_size = batch_size
+        self.pause = pause
+        self.interval = interval
+        self.task: asyncio.Task | None = None
+        self.purged: Counter[str] = Counter()
+        self.failures = 0
+
+    async def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def run(self):
+        while True:
+            try:
+                await self.purge()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failures += 1
+                logger.exception("Purge run failed")
+
+            await asyncio.sleep(self.interval)
+
+    async def purge(self):
+        for step in self.steps:
+            while True:
+                async with AsyncSessionLocal() as db, db.begin():
+                    count = await step(self.batch_size, db)
+                self.purged[step.__name__] += count
+
+                if count < self.batch_size:
+                    break
+                await asyncio.sleep(self.pause)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.task is not None and not self.task.done(),
+            "purged": dict(self.purged),
+            "failures": self.failures,
+        }
@@ -0,0 +1,34 @@
+from typing import Any
+from fastapi.datastructures import Default
+from fastapi.responses import JSONResponse
+
+from app.core.settings import settings
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, only needed for JSON_RESPONSE="orjson"
+    orjson = None
+
+
+class OrjsonResponse(JSONResponse):
+    """JSONResponse rendered by orjson.
+
+    Routes with a response_model hand over content that Pydantic has already
+    turned into JSON types, so the bytes match the default renderer. For raw
+    dicts, orjson writes UUIDs and datetimes exactly as str() and isoformat()
+    do, which is what jsonable_encoder produces.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def default_response_class():
+    if settings.JSON_RESPONSE == "orjson":
+        if orjson is None:
+            raise RuntimeError('JSON_RESPONSE="orjson" requires the orjson package')
+        return OrjsonResponse
+
+    # Kept as a placeholder so FastAPI can serialize response models straight
+    # to bytes through pydantic-core instead of going through a response class
+    return Default(JSONResponse)
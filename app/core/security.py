@@ -1,11 +1,26 @@
+import asyncio
+import time
 import jwt
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException, status
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 from datetime import datetime, timezone, timedelta
 
 from app.core.settings import settings
 
 
-password_hash = PasswordHash.recommended()
+# Tune the costs for the host with `python -m app.core.calibrate`. Hashes made
+# with other parameters are upgraded on the next successful sign in.
+password_hash = PasswordHash(
+    (
+        Argon2Hasher(
+            time_cost=settings.ARGON2_TIME_COST,
+            memory_cost=settings.ARGON2_MEMORY_COST,
+            parallelism=settings.ARGON2_PARALLELISM,
+        ),
+    )
+)
 
 
 def hash_password(password: str) -> str:
@@ -16,6 +31,116 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return password_hash.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return password_hash.verify_and_update(plain_password, hashed_password)
+
+
+# HASHING POOL
+# argon2 is deliberately slow, so it runs in a bounded pool instead of on the
+# event loop. Requests beyond the queue limit are turned away with a 503.
+
+hashing_executor: Executor | None = None
+hashing_stats = {
+    "in_flight": 0,
+    "completed": 0,
+    "rejected": 0,
+    "total_wait_seconds": 0.0,
+    "max_wait_seconds": 0.0,
+}
+
+
+def start_hashing_pool():
+    global hashing_executor
+
+    if settings.HASHING_EXECUTOR == "process":
+        hashing_executor = ProcessPoolExecutor(max_workers=settings.HASHING_WORKERS)
+    else:
+        hashing_executor = ThreadPoolExecutor(
+            max_workers=settings.HASHING_WORKERS, thread_name_prefix="hashing"
+        )
+
+
+def shutdown_hashing_pool():
+    global hashing_executor
+
+    if hashing_executor is not None:
+        hashing_executor.shutdown(wait=True)
+        hashing_executor = None
+
+
+def get_hashing_stats() -> dict:
+    in_flight = hashing_stats["in_flight"]
+    completed = hashing_stats["completed"]
+
+    return {
+        "executor": settings.HASHING_EXECUTOR,
+        "workers": settings.HASHING_WORKERS,
+        "queue_size": settings.HASHING_QUEUE_SIZE,
+        "in_flight": in_flight,
+        "queue_depth": max(in_flight - settings.HASHING_WORKERS, 0),
+        "completed": completed,
+        "rejected": hashing_stats["rejected"],
+        "avg_wait_ms": (
+            hashing_stats["total_wait_seconds"] / completed * 1000 if completed else 0.0
+        ),
+        "max_wait_ms": hashing_stats["max_wait_seconds"] * 1000,
+    }
+
+
+def timed_call(fn, *args):
+    # time.monotonic is system wide, so it can be compared across processes
+    return time.monotonic(), fn(*args)
+
+
+async def run_hashing(fn, *args):
+    if hashing_executor is None:
+        start_hashing_pool()
+
+    limit = settings.HASHING_WORKERS + settings.HASHING_QUEUE_SIZE
+    if hashing_stats["in_flight"] >= limit:
+        hashing_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again",
+            headers={"Retry-After": "1"},
+        )
+
+    hashing_stats["in_flight"] += 1
+    submitted_at = time.monotonic()
+    try:
+        loop = asyncio.get_running_loop()
+        started_at, result = await loop.run_in_executor(
+            hashing_executor, timed_call, fn, *args
+        )
+    finally:
+        hashing_stats["in_flight"] -= 1
+
+    wait = started_at - submitted_at
+    hashing_stats["completed"] += 1
+    hashing_stats["total_wait_seconds"] += wait
+    hashing_stats["max_wait_seconds"] = max(hashing_stats["max_wait_seconds"], wait)
+
+    return result
+
+
+async def hash_password_async(password: str) -> str:
+    return await run_hashing(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return await run_hashing(
+        verify_and_update_password, plain_password, hashed_password
+    )
+
+
 # TOKEN
 
 
@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -6,11 +7,76 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="UTF-8")
 
     DATABASE_URL: SecretStr
+    DATABASE_READ_URL: SecretStr | None = None
     ACCESS_SECRET_KEY: SecretStr
     REFRESH_SECRET_KEY: SecretStr
     ALGORITHM: str
     ACCESS_EXPIRE_MINUTES: int
     REFRESH_EXPIRE_DAYS: int
 
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT: float | None = 60
+    READ_YOUR_WRITES_SECONDS: int = 5
+
+    # "orjson" needs the orjson package installed
+    JSON_RESPONSE: Literal["default", "orjson"] = "default"
+
+    # Rows fetched per round trip by the streaming admin exports
+    EXPORT_FETCH_SIZE: int = 1000
+
+    SQL_INSTRUMENTATION: bool = True
+    SQL_REPEAT_THRESHOLD: int = 5
+
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # Entries are checked against the post's version on every read, the TTL
+    # only bounds how long outdated entries take up space
+    RESPONSE_CACHE_BACKEND: Literal["none", "memory", "redis"] = "memory"
+    RESPONSE_CACHE_SIZE: int = 10_000
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+    RESPONSE_CACHE_REDIS_URL: SecretStr | None = None
+
+    HASHING_EXECUTOR: Literal["thread", "process"] = "thread"
+    HASHING_WORKERS: int = 4
+    HASHING_QUEUE_SIZE: int = 64
+
+    # "sync" writes notifications in the request, "job" hands them to the job
+    # queue in the request transaction and "async" batches them after the
+    # request commits, which can lose the last batch on a crash
+    NOTIFICATION_DURABILITY: Literal["sync", "async", "job"] = "sync"
+    NOTIFICATION_BATCH_SIZE: int = 500
+    NOTIFICATION_FLUSH_INTERVAL_SECONDS: float = 0.5
+    NOTIFICATION_QUEUE_SIZE: int = 10_000
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: float = 15
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 100
+
+    # Upper bound for one POST /api/posts/bulk request
+    POST_BULK_MAX_ITEMS: int = 1000
+
+    # In-process job workers per API process, 0 leaves the jobs to
+    # `python -m app.worker`
+    JOB_WORKERS: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 1
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_BACKOFF_SECONDS: float = 2
+    JOB_MAX_BACKOFF_SECONDS: float = 300
+
+    # Soft-deleted rows are removed in batches of this size, with a pause in
+    # between so the purge never holds locks for long
+    PURGE_BATCH_SIZE: int = 500
+    PURGE_PAUSE_SECONDS: float = 0.2
+    PURGE_INTERVAL_SECONDS: float = 30
+
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+
 
 settings = Settings()  # type: ignore
@@ -1,11 +1,20 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from app.core.database import Base, engine
+from app.core.cache import response_cache
+from app.core.database import Base, ReadYourWritesMiddleware, engine, read_engine
+from app.core.responses import default_response_class
+from app.core.instrumentation import SQLInstrumentationMiddleware, instrument_engine
+from app.core.settings import settings
+from app.core.security import shutdown_hashing_pool, start_hashing_pool
+from app.services.notification import notification_listener, notification_writer
+from app.services.jobs import job_queue
+from app.services.purge import purger
 
 from app.routers.user import router as user_router
 from app.routers.post import router as post_router
 from app.routers.comment import router as comment_router
 from app.routers.notification import router as notification_router
+from app.routers.metrics import router as metrics_router
 
 
 @asynccontextmanager
@@ -13,12 +22,35 @@ async def lifespan(_app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+    start_hashing_pool()
+    await notification_writer.start()
+    await notification_listener.start()
+    await purger.start()
+    await job_queue.start()
+
     yield
 
+    await job_queue.stop()
+    await purger.stop()
+    await notification_listener.stop()
+    await notification_writer.stop()
+    shutdown_hashing_pool()
+    await response_cache.close()
     await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=default_response_class())
 
+if settings.SQL_INSTRUMENTATION:
+    instrument_engine(engine)
+    if read_engine is not engine:
+        instrument_engine(read_engine)
+    app.add_middleware(SQLInstrumentationMiddleware)
 
-app = FastAPI(lifespan=lifespan)
+if settings.DATABASE_READ_URL:
+    app.add_middleware(ReadYourWritesMiddleware)
 
 app.include_router(user_router, prefix="/api/users", tags=["users"])
 app.include_router(
@@ -26,3 +58,4 @@ app.include_router(
 )
 app.include_router(post_router, prefix="/api/posts", tags=["posts"])
 app.include_router(comment_router, prefix="/api/comments", tags=["comments"])
+app.include_router(metrics_router, prefix="/api/metrics", tags=["metrics"])
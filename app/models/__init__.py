@@ -1,3 +1,4 @@
 from app.models.user import User
 from app.models.post import Post
 from app.models.comment import Comment
+from app.models.job import Job
@@ -1,6 +1,17 @@
 import uuid
 from typing import TYPE_CHECKING
-from sqlalchemy import ForeignKey, UUID, DateTime, Text
+from sqlalchemy import (
+    Computed,
+    ForeignKey,
+    Index,
+    Integer,
+    UUID,
+    DateTime,
+    Text,
+    func,
+    literal_column,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from datetime import datetime, timezone
 
@@ -14,20 +25,49 @@ if TYPE_CHECKING:
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_post_id_date_created_id", "post_id", "date_created", "id"),
+        Index("ix_comments_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
 
     message: Mapped[str] = mapped_column(Text, nullable=False)
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
-    post_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("posts.id"), nullable=False)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    post_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("posts.id", ondelete="CASCADE"), nullable=False
+    )
     date_created: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+    )
+    version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version + 1"),
+    )
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('english', coalesce(message, ''))", persisted=True),
+        deferred=True,
+    )
 
     author: Mapped["User"] = relationship("User", back_populates="comments")
     post: Mapped["Post"] = relationship("Post", back_populates="comments")
     notifications: Mapped["Notification"] = relationship(
-        "Notification", back_populates="comment", cascade="all, delete-orphan"
+        "Notification",
+        back_populates="comment",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
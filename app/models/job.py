@@ -0,0 +1,59 @@
+import uuid
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any
+from sqlalchemy import (
+    DateTime,
+    Enum as SQLEnum,
+    Index,
+    Integer,
+    String,
+    Text,
+    UUID,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import mapped_column, Mapped
+
+from app.core.database import Base
+
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    FAILED = "failed"
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers only ever look for due queued jobs, failed ones stay out of it
+        Index(
+            "ix_jobs_run_at_queued",
+            "run_at",
+            postgresql_where=text("status = 'QUEUED'"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    kind: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    status: Mapped[JobStatus] = mapped_column(
+        SQLEnum(JobStatus, name="job_status"),
+        nullable=False,
+        default=JobStatus.QUEUED,
+        server_default=JobStatus.QUEUED.name,
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    run_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
@@ -1,6 +1,6 @@
 import uuid
 from typing import TYPE_CHECKING
-from sqlalchemy import String, ForeignKey, UUID, DateTime
+from sqlalchemy import DDL, Index, String, ForeignKey, UUID, DateTime, event, text
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from datetime import datetime, timezone
 
@@ -13,22 +13,81 @@ if TYPE_CHECKING:
     from app.models.comment import Comment
 
 
+NOTIFICATION_CHANNEL = "notifications"
+
+
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index(
+            "ix_notifications_user_id_notification_date_id",
+            "user_id",
+            "notification_date",
+            "id",
+        ),
+        # Only unread rows are indexed, so the badge count stays an index-only
+        # scan over a small index however much history a user has
+        Index(
+            "ix_notifications_user_id_unread",
+            "user_id",
+            postgresql_where=text("read_at IS NULL"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
-    post_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("posts.id"), nullable=False)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    post_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("posts.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     comment_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("comments.id"), nullable=False
+        ForeignKey("comments.id", ondelete="CASCADE"), nullable=False, index=True
     )
     message: Mapped[str] = mapped_column(String(100), nullable=False)
     notification_date: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+    read_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
     user: Mapped["User"] = relationship("User", back_populates="notifications")
     post: Mapped["Post"] = relationship("Post", back_populates="notifications")
     comment: Mapped["Comment"] = relationship("Comment", back_populates="notifications")
+
+
+# Every inserted row is announced on NOTIFICATION_CHANNEL, whichever worker or
+# code path wrote it. Delivery happens on commit, so rolled back rows are never
+# pushed to clients.
+event.listen(
+    Notification.__table__,
+    "after_create",
+    DDL(
+        f"""
+        CREATE OR REPLACE FUNCTION notify_notification_created() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{NOTIFICATION_CHANNEL}', json_build_object(
+                'id', NEW.id,
+                'user_id', NEW.user_id,
+                'post_id', NEW.post_id,
+                'comment_id', NEW.comment_id,
+                'message', NEW.message,
+                'notification_date', NEW.notification_date
+            )::text);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    ),
+)
+event.listen(
+    Notification.__table__,
+    "after_create",
+    DDL(
+        "CREATE TRIGGER notifications_notify AFTER INSERT ON notifications "
+        "FOR EACH ROW EXECUTE FUNCTION notify_notification_created()"
+    ),
+)
@@ -1,7 +1,20 @@
 import uuid
 from typing import TYPE_CHECKING, List
-from sqlalchemy import String, ForeignKey, UUID, DateTime, Text
-from sqlalchemy.orm import mapped_column, Mapped, relationship
+from sqlalchemy import (
+    Computed,
+    Index,
+    Integer,
+    String,
+    ForeignKey,
+    UUID,
+    DateTime,
+    Text,
+    func,
+    literal_column,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import mapped_column, Mapped, query_expression, relationship
 from datetime import datetime, timezone
 
 from app.core.database import Base
@@ -14,21 +27,90 @@ if TYPE_CHECKING:
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # Feed indexes only cover live posts, every feed query filters on it
+        Index(
+            "ix_posts_date_created_id",
+            "date_created",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_posts_user_id_date_created_id",
+            "user_id",
+            "date_created",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),
+        # Lets the purger find its work without scanning live posts
+        Index(
+            "ix_posts_deleted_at",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
+    # Kept next to the partial feed index, the users FK cascade needs an index
+    # that also covers deleted posts
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     title: Mapped[str] = mapped_column(String(100), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     date_created: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+    )
+    # Bumped by every UPDATE, ETags are derived from it
+    version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version + 1"),
+    )
+    # Set when the post is deleted, the purger removes the row later
+    deleted_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(content, ''))",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
+    # Visible comments, kept up to date by the comment write paths and the
+    # account soft delete so listings never count comments per row
+    comment_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    # Only populated by queries that use with_expression()
+    search_rank: Mapped[float | None] = query_expression()
 
     author: Mapped["User"] = relationship("User", back_populates="posts")
+    # Children are removed by ON DELETE CASCADE, never loaded just to delete them
     comments: Mapped[List["Comment"]] = relationship(
-        "Comment", back_populates="post", cascade="all, delete-orphan"
+        "Comment",
+        back_populates="post",
+        order_by="[Comment.date_created, Comment.id]",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     notifications: Mapped[List["Notification"]] = relationship(
-        "Notification", back_populates="post", cascade="all, delete-orphan"
+        "Notification",
+        back_populates="post",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
@@ -1,7 +1,18 @@
 import uuid
 from typing import TYPE_CHECKING, List
-from sqlalchemy import String, UUID, Enum as SQLEnum
+from sqlalchemy import (
+    DateTime,
+    Index,
+    Integer,
+    String,
+    UUID,
+    Enum as SQLEnum,
+    func,
+    literal_column,
+    text,
+)
 from sqlalchemy.orm import mapped_column, Mapped, relationship
+from datetime import datetime, timezone
 from enum import Enum
 
 from app.core.database import Base
@@ -19,6 +30,13 @@ class Role(Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index(
+            "ix_users_deleted_at",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -28,13 +46,41 @@ class User(Base):
     username: Mapped[str] = mapped_column(String(200), nullable=False, unique=True)
     password: Mapped[str] = mapped_column(String(200), nullable=False)
     role: Mapped[Role] = mapped_column(SQLEnum(Role), default=Role.USER)
+    token_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+    )
+    version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version + 1"),
+    )
+    deleted_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
     notifications: Mapped[List["Notification"]] = relationship(
-        "Notification", back_populates="user", cascade="all, delete-orphan"
+        "Notification",
+        back_populates="user",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     posts: Mapped[List["Post"]] = relationship(
-        "Post", back_populates="author", cascade="all, delete-orphan"
+        "Post",
+        back_populates="author",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     comments: Mapped[List["Comment"]] = relationship(
-        "Comment", back_populates="author", cascade="all, delete-orphan"
+        "Comment",
+        back_populates="author",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
@@ -1,18 +1,27 @@
 from uuid import UUID
 from fastapi import HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import delete, select
+from sqlalchemy.orm import aliased, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.comment import Comment
 from app.models.post import Post
+from app.repositories.post import (
+    adjust_comment_count_db,
+    invalidate_post,
+    touch_post_db,
+    live_comment,
+    live_post,
+)
 from app.models.user import User
+from app.schemas.user import Principal
 
 
 async def create_comment_db(comment: Comment, db: AsyncSession):
     db.add(comment)
-    await db.commit()
-    await db.refresh(comment)
+    await db.flush()
+    await adjust_comment_count_db(comment.post_id, 1, db)
+    invalidate_post(comment.post_id, db)
 
     return comment
 
@@ -24,7 +33,11 @@ async def get_comment_by_id_db(comment_id: UUID, db: AsyncSession) -> Comment:
             selectinload(Comment.author),
             selectinload(Comment.post).options(selectinload(Post.author)),
         )
-        .where(Comment.id == comment_id)
+        .where(
+            Comment.id == comment_id,
+            live_comment(),
+            Comment.post.has(live_post()),
+        )
     )
     result = await db.execute(stmt)
     comment = result.scalars().first()
@@ -37,14 +50,14 @@ async def get_comment_by_id_db(comment_id: UUID, db: AsyncSession) -> Comment:
     return comment
 
 
-async def get_my_comments_db(current_user: User, db: AsyncSession):
+async def get_my_comments_db(current_user: Principal, db: AsyncSession):
     stmt = (
         select(Comment)
         .options(
             selectinload(Comment.author),
             selectinload(Comment.post).options(selectinload(Post.author)),
         )
-        .where(Comment.user_id == current_user.id)
+        .where(Comment.user_id == current_user.id, Comment.post.has(live_post()))
     )
 
     result = await db.execute(stmt)
@@ -53,23 +66,70 @@ async def get_my_comments_db(current_user: User, db: AsyncSession):
     return comments
 
 
-async def get_all_comments_db(db: AsyncSession):
-    stmt = select(Comment).options(
-        selectinload(Comment.author),
-        selectinload(Comment.post).options(selectinload(Post.author)),
+def admin_comments_stmt():
+    # One JOIN over plain columns, no ORM objects are built for this listing
+    author = aliased(User)
+    post_author = aliased(User)
+    return (
+        select(
+            Comment.id,
+            Comment.message,
+            author.first_name,
+            author.last_name,
+            Post.title,
+            Post.content,
+            post_author.first_name.label("post_author_first_name"),
+            post_author.last_name.label("post_author_last_name"),
+        )
+        .join(author, author.id == Comment.user_id)
+        .join(Post, Post.id == Comment.post_id)
+        .join(post_author, post_author.id == Post.user_id)
+        .where(
+            author.deleted_at.is_(None),
+            Post.deleted_at.is_(None),
+            post_author.deleted_at.is_(None),
+        )
     )
 
-    result = await db.execute(stmt)
-    comments = result.scalars().all()
 
-    return comments
+def admin_comment_row_to_dict(row) -> dict:
+    return {
+        "id": row.id,
+        "message": row.message,
+        "author": {"first_name": row.first_name, "last_name": row.last_name},
+        "post": {
+            "title": row.title,
+            "content": row.content,
+            "author": {
+                "first_name": row.post_author_first_name,
+                "last_name": row.post_author_last_name,
+            },
+        },
+    }
+
+
+async def get_all_comments_db(db: AsyncSession):
+    result = await db.execute(admin_comments_stmt())
+
+    return [admin_comment_row_to_dict(row) for row in result]
 
 
 async def delete_comment_by_id_db(id: UUID, db: AsyncSession):
-    comment = await get_comment_by_id_db(id, db)
+    # Comments of soft-deleted users were already taken off the count, the
+    # purger removes them
+    result = await db.execute(
+        delete(Comment)
+        .where(Comment.id == id, live_comment())
+        .returning(Comment.post_id)
+    )
+    post_id = result.scalar_one_or_none()
+    if post_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found"
+        )
 
-    await db.delete(comment)
-    await db.commit()
+    await adjust_comment_count_db(post_id, -1, db)
+    invalidate_post(post_id, db)
 
 
 async def update_comment_db(
@@ -78,7 +138,43 @@ async def update_comment_db(
     for key, value in form_data.items():
         setattr(comment, key, value)
 
-    await db.commit()
-    await db.refresh(comment)
+    await db.flush()
+    await touch_post_db(comment.post_id, db)
+    invalidate_post(comment.post_id, db)
 
     return comment
+
+
+# PURGE
+async def purge_comments_of_deleted_posts_db(batch_size: int, db: AsyncSession) -> int:
+    batch = (
+        select(Comment.id)
+        .join(Post, Post.id == Comment.post_id)
+        .where(Post.deleted_at.is_not(None))
+        .limit(batch_size)
+        .with_for_update(of=Comment, skip_locked=True)
+    )
+    result = await db.execute(
+        delete(Comment)
+        .where(Comment.id.in_(batch))
+        .execution_options(synchronize_session=False)
+    )
+
+    return result.rowcount
+
+
+async def purge_comments_of_deleted_users_db(batch_size: int, db: AsyncSession) -> int:
+    batch = (
+        select(Comment.id)
+        .join(User, User.id == Comment.user_id)
+        .where(User.deleted_at.is_not(None))
+        .limit(batch_size)
+        .with_for_update(of=Comment, skip_locked=True)
+    )
+    result = await db.execute(
+        delete(Comment)
+        .where(Comment.id.in_(batch))
+        .execution_options(synchronize_session=False)
+    )
+
+    return result.rowcount
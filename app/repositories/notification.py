@@ -1,37 +1,164 @@
 from uuid import UUID
 from fastapi import HTTPException, status
-from sqlalchemy import delete, select
-from sqlalchemy.orm import selectinload
+from datetime import datetime, timezone
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.orm import aliased, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.comment import Comment
 from app.models.notification import Notification
 from app.models.post import Post
 from app.models.user import User
+from app.repositories.post import live_comment, live_post
+from app.schemas.user import Principal
 
 
 async def create_notification_db(notification: Notification, db: AsyncSession):
     db.add(notification)
-    await db.commit()
-    await db.refresh(notification)
+    await db.flush()
 
     return notification
 
 
-async def get_all_notification_db(current_user: User, db: AsyncSession):
+async def get_all_notification_db(
+    current_user: Principal,
+    limit: int,
+    after: tuple[datetime, UUID] | None,
+    db: AsyncSession,
+):
+    # One JOIN over plain columns in place of four selectinload round trips
+    recipient = aliased(User)
+    post_author = aliased(User)
+    commenter = aliased(User)
     stmt = (
-        select(Notification)
-        .options(
-            selectinload(Notification.user),
-            selectinload(Notification.post).selectinload(Post.author),
-            selectinload(Notification.comment).options(selectinload(Comment.author)),
+        select(
+            Notification.id,
+            Notification.message,
+            Notification.notification_date,
+            Notification.read_at,
+            recipient.first_name,
+            recipient.last_name,
+            Post.title,
+            Post.content,
+            post_author.first_name.label("post_author_first_name"),
+            post_author.last_name.label("post_author_last_name"),
+            Comment.message.label("comment_message"),
+            commenter.first_name.label("commenter_first_name"),
+            commenter.last_name.label("commenter_last_name"),
+        )
+        .join(recipient, recipient.id == Notification.user_id)
+        .join(Post, Post.id == Notification.post_id)
+        .join(post_author, post_author.id == Post.user_id)
+        .join(Comment, Comment.id == Notification.comment_id)
+        .join(commenter, commenter.id == Comment.user_id)
+        .where(
+            Notification.user_id == current_user.id,
+            Post.deleted_at.is_(None),
+            commenter.deleted_at.is_(None),
+        )
+        .order_by(Notification.notification_date.desc(), Notification.id.desc())
+        .limit(limit + 1)
+    )
+    if after:
+        stmt = stmt.where(
+            tuple_(Notification.notification_date, Notification.id) < after
+        )
+
+    result = await db.execute(stmt)
+
+    return [
+        {
+            "id": row.id,
+            "message": row.message,
+            "notification_date": row.notification_date,
+            "read_at": row.read_at,
+            "user": {"first_name": row.first_name, "last_name": row.last_name},
+            "post": {
+                "title": row.title,
+                "content": row.content,
+                "author": {
+                    "first_name": row.post_author_first_name,
+                    "last_name": row.post_author_last_name,
+                },
+            },
+            "comment": {
+                "message": row.comment_message,
+                "author": {
+                    "first_name": row.commenter_first_name,
+                    "last_name": row.commenter_last_name,
+                },
+            },
+        }
+        for row in result
+    ]
+
+
+async def get_notification_summaries_db(
+    current_user: Principal,
+    limit: int,
+    after: tuple[datetime, UUID] | None,
+    db: AsyncSession,
+):
+    # One JOIN over the rows of a single page, walking
+    # ix_notifications_user_id_notification_date_id backwards
+    stmt = (
+        select(
+            Notification.id,
+            Notification.post_id,
+            Notification.comment_id,
+            Notification.message,
+            Notification.notification_date,
+            Notification.read_at,
+            Post.title.label("post_title"),
+            User.first_name.label("commenter_first_name"),
+            User.last_name.label("commenter_last_name"),
+        )
+        .join(Post, Post.id == Notification.post_id)
+        .join(Comment, Comment.id == Notification.comment_id)
+        .join(User, User.id == Comment.user_id)
+        .where(
+            Notification.user_id == current_user.id,
+            Post.deleted_at.is_(None),
+            User.deleted_at.is_(None),
+        )
+        .order_by(Notification.notification_date.desc(), Notification.id.desc())
+        .limit(limit + 1)
+    )
+    if after:
+        stmt = stmt.where(
+            tuple_(Notification.notification_date, Notification.id) < after
         )
-        .where(Notification.user_id == current_user.id)
+
+    result = await db.execute(stmt)
+
+    return result.all()
+
+
+async def count_unread_notification_db(current_user: Principal, db: AsyncSession):
+    # Matches the predicate of ix_notifications_user_id_unread. Rows of
+    # soft-deleted posts are still counted until the purger removes them,
+    # joining them away would cost the index-only scan
+    stmt = select(func.count()).where(
+        Notification.user_id == current_user.id, Notification.read_at.is_(None)
     )
     result = await db.execute(stmt)
-    notifications = result.scalars().all()
 
-    return notifications
+    return result.scalar_one()
+
+
+async def mark_notifications_read_db(
+    current_user: Principal, notification_ids: list[UUID] | None, db: AsyncSession
+):
+    stmt = (
+        update(Notification)
+        .where(Notification.user_id == current_user.id, Notification.read_at.is_(None))
+        .values(read_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    if notification_ids is not None:
+        stmt = stmt.where(Notification.id.in_(notification_ids))
+
+    await db.execute(stmt)
 
 
 async def get_notification_by_id_db(
@@ -44,7 +171,12 @@ async def get_notification_by_id_db(
             selectinload(Notification.post).selectinload(Post.author),
             selectinload(Notification.comment).options(selectinload(Comment.author)),
         )
-        .where(Notification.id == notification_id)
+        .where(
+            Notification.id == notification_id,
+            # Hidden like in the listings until the purger removes the row
+            Notification.post.has(live_post()),
+            Notification.comment.has(live_comment()),
+        )
     )
     result = await db.execute(stmt)
     notification = result.scalars().first()
@@ -57,14 +189,33 @@ async def get_notification_by_id_db(
     return notification
 
 
-async def clear_all_notification_db(current_user: User, db: AsyncSession):
+async def clear_all_notification_db(current_user: Principal, db: AsyncSession):
     await db.execute(
         delete(Notification).where(Notification.user_id == current_user.id)
     )
-    await db.commit()
 
 
 async def delete_notification_by_id_db(notification_id: UUID, db: AsyncSession):
     notification = await get_notification_by_id_db(notification_id, db)
     await db.delete(notification)
-    await db.commit()
+    await db.flush()
+
+
+# PURGE
+async def purge_notifications_of_deleted_users_db(
+    batch_size: int, db: AsyncSession
+) -> int:
+    batch = (
+        select(Notification.id)
+        .join(User, User.id == Notification.user_id)
+        .where(User.deleted_at.is_not(None))
+        .limit(batch_size)
+        .with_for_update(of=Notification, skip_locked=True)
+    )
+    result = await db.execute(
+        delete(Notification)
+        .where(Notification.id.in_(batch))
+        .execution_options(synchronize_session=False)
+    )
+
+    return result.rowcount
@@ -1,53 +1,386 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Sequence
 from uuid import UUID
 from fastapi import HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import (
+    Float,
+    and_,
+    delete,
+    func,
+    insert,
+    select,
+    true,
+    tuple_,
+    union,
+    update,
+)
+from sqlalchemy.orm import aliased, selectinload, with_expression
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import response_cache
+from app.core.database import on_commit
 from app.models.comment import Comment
 from app.models.post import Post
 from app.models.user import User
 
 
+def post_cache_key(post_id: UUID) -> str:
+    return f"post:{post_id}"
+
+
+def invalidate_post(post_id: UUID, db: AsyncSession):
+    # Only frees the entry early, reads already skip entries of an older
+    # version. After commit, until then the old entry is still the current one
+    on_commit(db, response_cache.invalidate, post_cache_key(post_id))
+
+
 async def create_post_db(post: Post, db: AsyncSession):
     db.add(post)
-    await db.commit()
-    await db.refresh(post, attribute_names=["author", "comments"])
+    await db.flush()
+
+    # A new post has no comments, only the author has to be loaded
+    set_committed_value(post, "comments", [])
+    await db.refresh(post, attribute_names=["author"])
 
     return post
 
 
-async def get_all_post_db(user_id: UUID, db: AsyncSession):
+async def create_posts_db(rows: list[dict], db: AsyncSession) -> list[UUID]:
+    # A single multi-row INSERT ... RETURNING, ids come back in input order
     result = await db.execute(
-        select(Post)
-        .options(
-            selectinload(Post.author),
-            selectinload(Post.comments).options(selectinload(Comment.author)),
+        insert(Post).returning(Post.id, sort_by_parameter_order=True), rows
+    )
+
+    return list(result.scalars())
+
+
+def live_post():
+    # Soft-deleted posts, and posts of soft-deleted users, stay hidden until
+    # the purger removes them
+    return and_(Post.deleted_at.is_(None), Post.author.has(User.deleted_at.is_(None)))
+
+
+def live_comment():
+    return Comment.author.has(User.deleted_at.is_(None))
+
+
+async def adjust_comment_count_db(post_id: UUID, delta: int, db: AsyncSession):
+    # The version onupdate fires here too, a new or removed comment changes
+    # the post's ETag
+    await db.execute(
+        update(Post)
+        .where(Post.id == post_id)
+        .values(comment_count=Post.comment_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def touch_post_db(post_id: UUID, db: AsyncSession):
+    # Comments are rendered as part of the post, so editing one moves the
+    # post's version instead of every ETag aggregating over its comments
+    await db.execute(
+        update(Post)
+        .where(Post.id == post_id)
+        .values(version=Post.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def with_comments(stmt, comments_preview: int | None):
+    # In preview mode comments are attached afterwards by load_comment_previews_db
+    if comments_preview is None:
+        stmt = stmt.options(
+            selectinload(Post.comments.and_(live_comment())).options(
+                selectinload(Comment.author)
+            )
+        )
+
+    return stmt
+
+
+async def load_comment_previews_db(
+    posts: Sequence[Post], comments_preview: int, db: AsyncSession
+):
+    if not posts:
+        return
+
+    # The latest comments of each post, shown oldest first like a full thread
+    recent = (
+        select(Comment)
+        .where(Comment.post_id == Post.id, live_comment())
+        .order_by(Comment.date_created.desc(), Comment.id.desc())
+        .limit(comments_preview)
+        .lateral()
+    )
+    recent_comment = aliased(Comment, recent)
+
+    result = await db.execute(
+        select(recent_comment)
+        .select_from(Post)
+        .join(recent, true())
+        .options(selectinload(recent_comment.author))
+        .where(Post.id.in_([post.id for post in posts]))
+        .order_by(recent_comment.date_created, recent_comment.id)
+    )
+
+    previews = defaultdict(list)
+    for comment in result.scalars().all():
+        previews[comment.post_id].append(comment)
+
+    for post in posts:
+        set_committed_value(post, "comments", previews[post.id])
+
+
+def post_rows_stmt():
+    # Plain columns instead of ORM entities, the listings are read-only so
+    # identity map bookkeeping and attribute instrumentation buy nothing
+    return (
+        select(
+            Post.id,
+            Post.title,
+            Post.content,
+            Post.date_created,
+            User.first_name,
+            User.last_name,
+            Post.comment_count,
         )
+        .join(User, User.id == Post.user_id)
+        .where(Post.deleted_at.is_(None), User.deleted_at.is_(None))
+    )
+
+
+async def load_comment_rows_db(
+    post_ids: list[UUID], comments_preview: int | None, db: AsyncSession
+) -> defaultdict[UUID, list[dict]]:
+    if comments_preview is None:
+        stmt = (
+            select(
+                Comment.id,
+                Comment.post_id,
+                Comment.message,
+                User.first_name,
+                User.last_name,
+            )
+            .join(User, User.id == Comment.user_id)
+            .where(Comment.post_id.in_(post_ids), User.deleted_at.is_(None))
+            .order_by(Comment.date_created, Comment.id)
+        )
+    else:
+        # Latest `comments_preview` per post, returned in thread order
+        recent = (
+            select(
+                Comment.id,
+                Comment.post_id,
+                Comment.message,
+                Comment.user_id,
+                Comment.date_created,
+            )
+            .where(Comment.post_id == Post.id, live_comment())
+            .order_by(Comment.date_created.desc(), Comment.id.desc())
+            .limit(comments_preview)
+            .lateral()
+        )
+        stmt = (
+            select(
+                recent.c.id,
+                recent.c.post_id,
+                recent.c.message,
+                User.first_name,
+                User.last_name,
+            )
+            .select_from(Post)
+            .join(recent, true())
+            .join(User, User.id == recent.c.user_id)
+            .where(Post.id.in_(post_ids))
+            .order_by(recent.c.date_created, recent.c.id)
+        )
+
+    result = await db.execute(stmt)
+
+    comments = defaultdict(list)
+    for row in result:
+        comments[row.post_id].append(
+            {
+                "id": row.id,
+                "message": row.message,
+                "author": {"first_name": row.first_name, "last_name": row.last_name},
+            }
+        )
+
+    return comments
+
+
+async def list_post_rows_db(
+    stmt, comments_preview: int | None, db: AsyncSession
+) -> list[dict]:
+    result = await db.execute(stmt)
+    rows = result.all()
+    if not rows:
+        return []
+
+    comments = await load_comment_rows_db(
+        [row.id for row in rows], comments_preview, db
+    )
+
+    return [
+        {
+            "id": row.id,
+            "title": row.title,
+            "content": row.content,
+            "date_created": row.date_created,
+            "author": {"first_name": row.first_name, "last_name": row.last_name},
+            "comments": comments[row.id],
+            "comment_count": row.comment_count,
+        }
+        for row in rows
+    ]
+
+
+async def get_all_post_db(
+    user_id: UUID,
+    limit: int,
+    after: tuple[datetime, UUID] | None,
+    comments_preview: int | None,
+    db: AsyncSession,
+):
+    stmt = (
+        post_rows_stmt()
         .where(Post.user_id == user_id)
+        .order_by(Post.date_created.desc(), Post.id.desc())
+        .limit(limit + 1)
     )
-    posts = result.scalars().all()
+    if after:
+        stmt = stmt.where(tuple_(Post.date_created, Post.id) < after)
 
-    return posts
+    return await list_post_rows_db(stmt, comments_preview, db)
 
 
-async def feed_post_db(db: AsyncSession):
-    result = await db.execute(
-        select(Post).options(
+async def feed_post_db(
+    limit: int,
+    after: tuple[datetime, UUID] | None,
+    comments_preview: int | None,
+    db: AsyncSession,
+):
+    stmt = (
+        post_rows_stmt()
+        .order_by(Post.date_created.desc(), Post.id.desc())
+        .limit(limit + 1)
+    )
+    if after:
+        stmt = stmt.where(tuple_(Post.date_created, Post.id) < after)
+
+    return await list_post_rows_db(stmt, comments_preview, db)
+
+
+def post_versions_stmt():
+    # Post.version moves with every change to the post, its comments and the
+    # names of its commenters, so a rendered post is versioned by two columns
+    return (
+        select(Post.id, Post.version, User.version.label("author_version"))
+        .join(User, User.id == Post.user_id)
+        .where(Post.deleted_at.is_(None), User.deleted_at.is_(None))
+    )
+
+
+async def get_post_versions_db(post_id: UUID, db: AsyncSession):
+    result = await db.execute(post_versions_stmt().where(Post.id == post_id))
+
+    return result.first()
+
+
+async def feed_post_versions_db(
+    limit: int, after: tuple[datetime, UUID] | None, db: AsyncSession
+):
+    stmt = (
+        post_versions_stmt()
+        .order_by(Post.date_created.desc(), Post.id.desc())
+        .limit(limit + 1)
+    )
+    if after:
+        stmt = stmt.where(tuple_(Post.date_created, Post.id) < after)
+
+    result = await db.execute(stmt)
+
+    return result.all()
+
+
+async def search_posts_db(
+    query: str,
+    limit: int,
+    after: tuple[float, UUID] | None,
+    comments_preview: int | None,
+    db: AsyncSession,
+):
+    ts_query = func.websearch_to_tsquery("english", query)
+
+    # Both branches are GIN index scans, ranking only touches the matches.
+    # Comments of soft-deleted users neither match nor rank, like in previews
+    matched = union(
+        select(Post.id.label("post_id")).where(
+            Post.search_vector.bool_op("@@")(ts_query)
+        ),
+        select(Comment.post_id).where(
+            Comment.search_vector.bool_op("@@")(ts_query), live_comment()
+        ),
+    ).subquery()
+
+    best_comment_rank = (
+        select(func.max(func.ts_rank(Comment.search_vector, ts_query)))
+        .where(
+            Comment.post_id == Post.id,
+            Comment.search_vector.bool_op("@@")(ts_query),
+            live_comment(),
+        )
+        .correlate(Post)
+        .scalar_subquery()
+    )
+    ranked = (
+        select(
+            Post.id,
+            (
+                func.ts_rank(Post.search_vector, ts_query)
+                + func.coalesce(best_comment_rank, 0)
+            )
+            .cast(Float)
+            .label("rank"),
+        )
+        .join(matched, matched.c.post_id == Post.id)
+        .subquery()
+    )
+
+    stmt = (
+        select(Post)
+        .join(ranked, ranked.c.id == Post.id)
+        .options(
             selectinload(Post.author),
-            selectinload(Post.comments).options(selectinload(Comment.author)),
+            with_expression(Post.search_rank, ranked.c.rank),
         )
+        .where(live_post())
+        .order_by(ranked.c.rank.desc(), Post.id.desc())
+        .limit(limit + 1)
     )
+    if after:
+        stmt = stmt.where(tuple_(ranked.c.rank, Post.id) < after)
+
+    result = await db.execute(with_comments(stmt, comments_preview))
     posts = result.scalars().all()
 
+    if comments_preview is not None:
+        await load_comment_previews_db(posts, comments_preview, db)
+
     return posts
 
 
 async def get_post_by_id_db(post_id: UUID, db: AsyncSession):
     result = await db.execute(
-        select(Post)
-        .options(selectinload(Post.author), selectinload(Post.comments))
-        .where(Post.id == post_id)
+        with_comments(
+            select(Post)
+            .options(selectinload(Post.author))
+            .where(Post.id == post_id, live_post()),
+            None,
+        )
     )
     post = result.scalars().first()
     if not post:
@@ -58,24 +391,93 @@ async def get_post_by_id_db(post_id: UUID, db: AsyncSession):
     return post
 
 
-async def update_post_db(to_update: dict, post: Post, db: AsyncSession):
-    for key, value in to_update.items():
-        setattr(post, key, value)
-
-    await db.commit()
-    await db.refresh(post)
+async def get_post_ref_db(post_id: UUID, db: AsyncSession):
+    # For write paths that only check existence and ownership, the comment
+    # graph of get_post_by_id_db is only needed to render a post
+    result = await db.execute(
+        select(Post.id, Post.user_id, Post.version).where(
+            Post.id == post_id, live_post()
+        )
+    )
+    post = result.first()
+    if not post:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
+        )
 
     return post
 
 
-async def delete_post_db(current_user: User, post: Post, db: AsyncSession):
+async def update_post_db(post_id: UUID, to_update: dict, db: AsyncSession):
+    if to_update:
+        await db.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(**to_update)
+            .execution_options(synchronize_session=False)
+        )
+        invalidate_post(post_id, db)
+
 
-    await db.delete(post)
-    await db.commit()
+async def delete_post_db(post_id: UUID, db: AsyncSession):
+    # Only marked here, the purger deletes the row and its comments later
+    await db.execute(
+        update(Post)
+        .where(Post.id == post_id)
+        .values(deleted_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    invalidate_post(post_id, db)
 
 
 async def delete_post_admin_db(post_id: UUID, db: AsyncSession):
-    post = await get_post_by_id_db(post_id, db)
+    result = await db.execute(
+        update(Post)
+        .where(Post.id == post_id, Post.deleted_at.is_(None))
+        .values(deleted_at=datetime.now(timezone.utc))
+        .returning(Post.id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
+        )
+
+    invalidate_post(post_id, db)
+
+
+# PURGE
+async def mark_posts_of_deleted_users_db(batch_size: int, db: AsyncSession) -> int:
+    # Hidden already through live_post(), marking them lets the later steps
+    # treat these posts like any other deleted one
+    batch = (
+        select(Post.id)
+        .join(User, User.id == Post.user_id)
+        .where(Post.deleted_at.is_(None), User.deleted_at.is_not(None))
+        .limit(batch_size)
+        .with_for_update(of=Post, skip_locked=True)
+    )
+    result = await db.execute(
+        update(Post)
+        .where(Post.id.in_(batch))
+        .values(deleted_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+    return result.rowcount
+
+
+async def purge_deleted_posts_db(batch_size: int, db: AsyncSession) -> int:
+    # Runs after their comments are gone, so each cascade stays small
+    batch = (
+        select(Post.id)
+        .where(Post.deleted_at.is_not(None))
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        delete(Post)
+        .where(Post.id.in_(batch))
+        .execution_options(synchronize_session=False)
+    )
 
-    await db.delete(post)
-    await db.commit()
+    return result.rowcount
@@ -1,25 +1,39 @@
 import uuid
 import jwt
+from datetime import datetime, timezone
 from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy import select
+from sqlalchemy import delete, exists, func, select, true, union, update
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TTLCache
 from app.core.settings import settings
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal
 from app.models.comment import Comment
+from app.models.notification import Notification
 from app.models.post import Post
 from app.models.user import Role, User
+from app.repositories.post import live_comment, live_post
+from app.schemas.user import Principal
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/users/signIn")
 
+# Principals are cached per worker, so a change made through another worker is
+# only picked up here once the entry expires or the token version moves on.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_principal(user_id: uuid.UUID):
+    principal_cache.delete(user_id)
+
 
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[AsyncSession, Depends(get_db)],
 ):
     try:
         payload = jwt.decode(
@@ -35,6 +49,14 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+        token_version = payload.get("ver")
+        if not isinstance(token_version, int):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token missing version",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
         user_id = uuid.UUID(sub)
 
     except (jwt.PyJWKError, jwt.InvalidSignatureError, jwt.ExpiredSignatureError):
@@ -44,26 +66,43 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    result = await db.execute(
-        select(User)
-        .options(
-            selectinload(User.posts).options(
-                selectinload(Post.comments).options(selectinload(Comment.author))
-            ),
-            selectinload(User.comments),
+    principal = principal_cache.get(user_id)
+    if principal and principal.token_version == token_version:
+        return principal
+
+    # A short session of its own, so the connection goes back to the pool
+    # before the endpoint runs instead of being held until the response ends
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(
+                User.id,
+                User.username,
+                User.first_name,
+                User.last_name,
+                User.role,
+                User.token_version,
+            ).where(User.id == user_id, User.deleted_at.is_(None))
         )
-        .where(User.id == user_id)
-    )
+        row = result.first()
 
-    user = result.scalars().first()
-    if not user:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    return user
+    if row.token_version != token_version or row.role.value != payload.get("role"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    principal = Principal.model_validate(row, from_attributes=True)
+    principal_cache.set(user_id, principal)
+
+    return principal
 
 
 async def check_username_exist(username: str, db: AsyncSession):
@@ -80,7 +119,7 @@ async def check_username_exist(username: str, db: AsyncSession):
 
 
 def required_role(role: Role):
-    def role_checker(current_user: Annotated[User, Depends(get_current_user)]):
+    def role_checker(current_user: Annotated[Principal, Depends(get_current_user)]):
         if role != current_user.role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -91,16 +130,83 @@ def required_role(role: Role):
     return role_checker
 
 
-async def get_user_by_username(username: str, db):
-    stmt = (
+async def get_user_by_id_db(user_id: uuid.UUID, db: AsyncSession) -> User:
+    result = await db.execute(
+        select(User).where(User.id == user_id, User.deleted_at.is_(None))
+    )
+
+    user = result.scalars().first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+
+    return user
+
+
+async def get_user_activity_db(user_id: uuid.UUID, db: AsyncSession) -> User:
+    result = await db.execute(
         select(User)
         .options(
-            selectinload(User.posts),
-            selectinload(User.comments),
+            selectinload(User.posts.and_(Post.deleted_at.is_(None))).options(
+                selectinload(Post.comments.and_(live_comment())).options(
+                    selectinload(Comment.author)
+                )
+            ),
+            selectinload(User.comments.and_(Comment.post.has(live_post()))).options(
+                selectinload(Comment.author),
+                selectinload(Comment.post).options(
+                    selectinload(Post.comments.and_(live_comment())).options(
+                        selectinload(Comment.author)
+                    )
+                ),
+            ),
+        )
+        .where(User.id == user_id, User.deleted_at.is_(None))
+    )
+
+    user = result.scalars().first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+
+    return user
+
+
+async def get_user_activity_versions_db(user_id: uuid.UUID, db: AsyncSession):
+    # /me renders the user's own posts and the posts they commented on. Each
+    # of those posts carries a version that already covers its comments, so
+    # only the post rows are read, never the comments on them
+    thread_post_ids = union(
+        select(Post.id).where(Post.user_id == user_id, Post.deleted_at.is_(None)),
+        select(Comment.post_id).where(
+            Comment.user_id == user_id, Comment.post.has(live_post())
+        ),
+    )
+    posts = (
+        select(
+            func.count(Post.id).label("post_count"),
+            func.coalesce(func.sum(Post.version), 0).label("post_versions"),
+            func.max(Post.updated_at).label("posts_updated_at"),
         )
-        .where(User.username == username)
+        .where(Post.id.in_(thread_post_ids))
+        .subquery()
     )
 
+    result = await db.execute(
+        select(User.id, User.version, posts)
+        .select_from(User)
+        .join(posts, true())
+        .where(User.id == user_id)
+    )
+
+    return result.first()
+
+
+async def get_user_by_username(username: str, db):
+    stmt = select(User).where(User.username == username, User.deleted_at.is_(None))
+
     result = await db.execute(stmt)
 
     user = result.scalars().first()
@@ -116,40 +222,106 @@ async def create_user_db(form_data: dict, db: AsyncSession):
     new_user = User(**form_data)
 
     db.add(new_user)
-    await db.commit()
-    await db.refresh(new_user)
+    await db.flush()
 
 
 async def update_user_partial_db(form_data: dict, user: User, db: AsyncSession):
     for key, value in form_data.items():
         setattr(user, key, value)
 
-    await db.commit()
-    await db.refresh(user)
+    # Tokens carry the role as a claim, a role change has to revoke them
+    if "role" in form_data:
+        user.token_version += 1
+
+    await db.flush()
+
+    # Names are rendered into every post the user wrote or commented on. A
+    # UNION of ids, an OR across the two lookups would scan every post
+    if "first_name" in form_data or "last_name" in form_data:
+        thread_post_ids = union(
+            select(Post.id).where(Post.user_id == user.id),
+            select(Comment.post_id).where(Comment.user_id == user.id),
+        )
+        await db.execute(
+            update(Post)
+            .where(Post.id.in_(thread_post_ids))
+            .values(version=Post.version + 1)
+            .execution_options(synchronize_session=False)
+        )
 
     return user
 
 
 async def change_password_db(hashed_pwd: str, user: User, db: AsyncSession):
     user.password = hashed_pwd
+    user.token_version += 1
+
+    await db.flush()
+
+
+async def update_password_hash_db(hashed_pwd: str, user: User, db: AsyncSession):
+    # Same password, new parameters, so existing tokens stay valid
+    user.password = hashed_pwd
 
-    await db.commit()
-    await db.refresh(user)
+    await db.flush()
 
 
 async def delete_user_db(user: User, db: AsyncSession):
-    await db.delete(user)
-    await db.commit()
+    # Only marked here, the purger removes the account and everything it owns.
+    # The token version moves on so tokens already issued stop working at once
+    user.deleted_at = datetime.now(timezone.utc)
+    user.token_version += 1
+
+    await db.flush()
+
+    # Their comments disappear from every thread now, not when purged
+    removed = (
+        select(Comment.post_id, func.count().label("count"))
+        .where(Comment.user_id == user.id)
+        .group_by(Comment.post_id)
+        .subquery()
+    )
+    await db.execute(
+        update(Post)
+        .where(Post.id == removed.c.post_id)
+        .values(comment_count=Post.comment_count - removed.c.count)
+        .execution_options(synchronize_session=False)
+    )
 
 
 # ADMIN
+def all_users_stmt():
+    # Only the columns UserOnlyResponse needs, as plain rows
+    return select(
+        User.id, User.first_name, User.last_name, User.username, User.role
+    ).where(User.deleted_at.is_(None))
+
+
 async def get_all_user(db: AsyncSession):
-    result = await db.execute(
-        select(User).options(
-            selectinload(User.posts).options(selectinload(Post.comments)),
-            selectinload(User.comments),
+    result = await db.execute(all_users_stmt())
+
+    return result.all()
+
+
+# PURGE
+async def purge_deleted_users_db(batch_size: int, db: AsyncSession) -> int:
+    # Only accounts the earlier steps have emptied, so the cascade has nothing
+    # left to do. One deleted during this run waits for the next run
+    batch = (
+        select(User.id)
+        .where(
+            User.deleted_at.is_not(None),
+            ~exists().where(Post.user_id == User.id),
+            ~exists().where(Comment.user_id == User.id),
+            ~exists().where(Notification.user_id == User.id),
         )
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        delete(User)
+        .where(User.id.in_(batch))
+        .execution_options(synchronize_session=False)
     )
-    users = result.scalars().all()
 
-    return users
+    return result.rowcount
@@ -0,0 +1,74 @@
+from typing import Annotated
+from fastapi.routing import APIRouter
+from fastapi import status, Depends
+
+from app.core.cache import response_cache
+from app.core.database import engine, read_engine
+from app.core.instrumentation import get_sql_stats
+from app.core.security import get_hashing_stats
+from app.models.user import Role
+from app.repositories.user import required_role
+from app.schemas.user import Principal
+from app.services.notification import notification_listener, notification_writer
+from app.services.jobs import job_queue
+from app.services.purge import purger
+
+
+router = APIRouter()
+
+
+# ADMIN
+@router.get("/hashing", status_code=status.HTTP_200_OK)
+async def hashing_metrics(
+    current_user: Annotated[Principal, Depends(required_role(Role.ADMIN))],
+):
+    return get_hashing_stats()
+
+
+@router.get("/sql", status_code=status.HTTP_200_OK)
+async def sql_metrics(
+    current_user: Annotated[Principal, Depends(required_role(Role.ADMIN))],
+):
+    return get_sql_stats()
+
+
+@router.get("/pool", status_code=status.HTTP_200_OK)
+async def pool_metrics(
+    current_user: Annotated[Principal, Depends(required_role(Role.ADMIN))],
+):
+    stats = {"primary": engine.pool.stats()}
+    if read_engine is not engine:
+        stats["read"] = read_engine.pool.stats()
+
+    return stats
+
+
+@router.get("/notifications", status_code=status.HTTP_200_OK)
+async def notification_writer_metrics(
+    current_user: Annotated[Principal, Depends(required_role(Role.ADMIN))],
+):
+    return {
+        "writer": notification_writer.stats(),
+        "listener": notification_listener.stats(),
+    }
+
+
+@router.get("/cache", status_code=status.HTTP_200_OK)
+async def response_cache_metrics(
+    current_user: Annotated[Principal, Depends(required_role(Role.ADMIN))],
+):
+    return response_cache.stats()
+
+
+@router.get("/purge", status_code=status.HTTP_200_OK)
+async def purge_metrics(
+    current_user: Annotated[Principal, Depends(required_role(Role.ADMIN))],
+):
+    return purger.stats()
+
+
+@router.get("/jobs", status_code=status.HTTP_200_OK)
+async def job_metrics(
+    current_user: Annotated[Principal, Depends(required_role(Role.ADMIN))],
+):
+    return job_queue.stats()
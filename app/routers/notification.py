@@ -1,40 +1,103 @@
 from uuid import UUID
-from typing import Annotated, List
+from typing import Annotated
 from fastapi.routing import APIRouter
-from fastapi import status, Depends
+from fastapi import Query, Request, status, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.models.user import User
+from app.core.database import get_db, get_read_db
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.repositories.user import get_current_user
-from app.schemas.notification import NotificationResponse
+from app.schemas.notification import (
+    NotificationMarkRead,
+    NotificationPage,
+    NotificationResponse,
+    NotificationSummaryPage,
+    UnreadCountResponse,
+)
+from app.schemas.user import Principal
 from app.services.notification import (
     clear_notifications_service,
     delete_notification_service,
     get_notification_service,
+    mark_notifications_read_service,
     my_notifications_service,
+    notification_summaries_service,
+    stream_notifications_service,
+    unread_count_service,
 )
 
 
 router = APIRouter()
 
 
+@router.get("", response_model=NotificationPage, status_code=status.HTTP_200_OK)
+async def my_notifications(
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+):
+    notifications = await my_notifications_service(limit, cursor, db, current_user)
+
+    return notifications
+
+
 @router.get(
-    "", response_model=List[NotificationResponse], status_code=status.HTTP_200_OK
+    "/summary", response_model=NotificationSummaryPage, status_code=status.HTTP_200_OK
 )
-async def my_notifications(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+async def notification_summaries(
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
 ):
-    notifications = await my_notifications_service(db, current_user)
+    notifications = await notification_summaries_service(
+        limit, cursor, db, current_user
+    )
 
     return notifications
 
 
+@router.get(
+    "/unread_count",
+    response_model=UnreadCountResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def unread_count(
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
+):
+    count = await unread_count_service(db, current_user)
+
+    return count
+
+
+@router.patch("/read", status_code=status.HTTP_204_NO_CONTENT)
+async def mark_notifications_read(
+    form_data: NotificationMarkRead,
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
+    current_user: Annotated[Principal, Depends(get_current_user)],
+):
+    await mark_notifications_read_service(form_data, db, current_user)
+
+
+@router.get("/stream", status_code=status.HTTP_200_OK)
+async def stream_notifications(
+    request: Request,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+):
+    return StreamingResponse(
+        stream_notifications_service(request, current_user),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
 async def clear_notifications(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ):
     await clear_notifications_service(db, current_user)
 
@@ -46,8 +109,8 @@ async def clear_notifications(
 )
 async def get_notification(
     notification_id: UUID,
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ):
     notification = await get_notification_service(notification_id, db, current_user)
 
@@ -57,7 +120,7 @@ async def get_notification(
 @router.delete("/{notification_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_notification(
     notification_id: UUID,
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ):
     await delete_notification_service(notification_id, db)
@@ -1,20 +1,40 @@
 from uuid import UUID
-from typing import Annotated, List
+from typing import Annotated, Any, List
 from fastapi.routing import APIRouter
-from fastapi import status, Depends
+from fastapi import Body, Query, Request, Response, status, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.models.user import Role, User
+from app.core.database import get_db, get_read_db, use_snapshot
+from app.core.etag import etag_matches, not_modified, set_etag
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_COMMENT_PREVIEW,
+    MAX_PAGE_SIZE,
+)
+from app.core.settings import settings
+from app.models.user import Role
 from app.repositories.user import get_current_user, required_role
-from app.schemas.post import PostCreate, PostResponse, PostUpdate
+from app.schemas.post import (
+    PostBulkResponse,
+    PostCreate,
+    PostPage,
+    PostResponse,
+    PostUpdate,
+)
+from app.schemas.user import Principal
 from app.services.post import (
     create_post_service,
+    create_posts_bulk_service,
     delete_post_admin_service,
     delete_post_service,
+    feed_post_etag_service,
     feed_post_service,
+    cache_post_service,
+    get_cached_post_service,
     get_post_service,
+    post_etag_service,
     my_posts_service,
+    search_posts_service,
     update_post_service,
 )
 
@@ -23,21 +43,35 @@ router = APIRouter()
 
 
 # ADMIN
-@router.delete("/admin/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/admin/{post_id}", status_code=status.HTTP_202_ACCEPTED, response_class=Response
+)
 async def delete_post_admin(
     post_id: UUID,
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(required_role(Role.ADMIN))],
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
+    current_user: Annotated[Principal, Depends(required_role(Role.ADMIN))],
 ):
     await delete_post_admin_service(post_id, db)
 
 
-@router.get("", response_model=List[PostResponse], status_code=status.HTTP_200_OK)
+@router.get("", response_model=PostPage, status_code=status.HTTP_200_OK)
 async def feed_post(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    comments_preview: Annotated[int | None, Query(ge=1, le=MAX_COMMENT_PREVIEW)] = None,
 ):
-    posts = await feed_post_service(db)
+    # The ETag is read before the body, so a write landing in between can only
+    # make the client refetch, never pin it to a stale page
+    etag = await feed_post_etag_service(limit, cursor, db)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    posts = await feed_post_service(limit, cursor, comments_preview, db)
+    set_etag(response, etag)
 
     return posts
 
@@ -45,22 +79,52 @@ async def feed_post(
 @router.post("", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
 async def create_post(
     form_data: PostCreate,
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ):
     post = await create_post_service(form_data, db, current_user)
 
     return post
 
 
-@router.get(
-    "/my_post", response_model=List[PostResponse], status_code=status.HTTP_200_OK
-)
+@router.post("/bulk", response_model=PostBulkResponse, status_code=status.HTTP_200_OK)
+async def create_posts_bulk(
+    items: Annotated[
+        List[Any],
+        Body(min_length=1, max_length=settings.POST_BULK_MAX_ITEMS),
+    ],
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    atomic: bool = False,
+):
+    result = await create_posts_bulk_service(items, atomic, db, current_user)
+
+    return result
+
+
+@router.get("/my_post", response_model=PostPage, status_code=status.HTTP_200_OK)
 async def my_posts(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    comments_preview: Annotated[int | None, Query(ge=1, le=MAX_COMMENT_PREVIEW)] = None,
 ):
-    posts = await my_posts_service(db, current_user)
+    posts = await my_posts_service(limit, cursor, comments_preview, db, current_user)
+
+    return posts
+
+
+@router.get("/search", response_model=PostPage, status_code=status.HTTP_200_OK)
+async def search_posts(
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    comments_preview: Annotated[int | None, Query(ge=1, le=MAX_COMMENT_PREVIEW)] = None,
+):
+    posts = await search_posts_service(q, limit, cursor, comments_preview, db)
 
     return posts
 
@@ -68,30 +132,47 @@ async def my_posts(
 @router.get("/{post_id}", response_model=PostResponse, status_code=status.HTTP_200_OK)
 async def get_post(
     post_id: UUID,
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ):
-    post = await get_post_service(post_id, db, current_user)
+    # The tag and the body come from one snapshot, so a body rendered here
+    # can only ever be stored under the version it was rendered from
+    await use_snapshot(db)
+    etag = await post_etag_service(post_id, db)
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
 
-    return post
+    body = await get_cached_post_service(post_id, etag) if etag else None
+    if body is None:
+        # Raises the 404 when there is no tag, the post does not exist
+        post = await get_post_service(post_id, db, current_user)
+        body = await cache_post_service(post, etag)
+
+    response = Response(body, media_type="application/json")
+    set_etag(response, etag)
+
+    return response
 
 
 @router.patch("/{post_id}", response_model=PostResponse, status_code=status.HTTP_200_OK)
 async def update_post(
     form_data: PostUpdate,
     post_id: UUID,
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ):
     updated_post = await update_post_service(form_data, post_id, db, current_user)
 
     return updated_post
 
 
-@router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/{post_id}", status_code=status.HTTP_202_ACCEPTED, response_class=Response
+)
 async def delete_post(
     post_id: UUID,
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ):
     await delete_post_service(post_id, db, current_user)
@@ -1,12 +1,14 @@
 from uuid import UUID
 from typing import Annotated, List
 from fastapi.routing import APIRouter
-from fastapi import status, Depends
+from fastapi import Request, Response, status, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.models.user import Role, User
+from app.core.database import get_db, get_read_db
+from app.core.etag import etag_matches, not_modified, set_etag
+from app.core.export import ExportFormat, export_response
+from app.models.user import Role
 from app.repositories.user import (
     get_current_user,
     required_role,
@@ -14,6 +16,7 @@ from app.repositories.user import (
 from app.schemas.user import (
     ChangePassword,
     PasswordRequired,
+    Principal,
     Token,
     UserCreate,
     UserOnlyResponse,
@@ -24,7 +27,9 @@ from app.services.user import (
     change_password_service,
     delete_profile_service,
     delete_user_service,
+    export_users_service,
     get_users_service,
+    my_profile_etag_service,
     my_profile_service,
     sign_in_service,
     sign_up_service,
@@ -38,14 +43,17 @@ router = APIRouter()
 @router.post("/signIn", response_model=Token, status_code=status.HTTP_200_OK)
 async def sign_in(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
 ):
     result = await sign_in_service(form_data, db)
     return result
 
 
 @router.post("/signUp", status_code=status.HTTP_201_CREATED)
-async def sign_up(form_data: UserCreate, db: Annotated[AsyncSession, Depends(get_db)]):
+async def sign_up(
+    form_data: UserCreate,
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
+):
     result = await sign_up_service(form_data, db)
     return result
 
@@ -54,17 +62,26 @@ async def sign_up(form_data: UserCreate, db: Annotated[AsyncSession, Depends(get
     "/me", response_model=UserResponseWithActivity, status_code=status.HTTP_200_OK
 )
 async def my_profile(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ):
-    return await my_profile_service(db, current_user)
+    etag = await my_profile_etag_service(db, current_user)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    profile = await my_profile_service(db, current_user)
+    set_etag(response, etag)
+
+    return profile
 
 
 @router.patch("/me", response_model=UserOnlyResponse, status_code=status.HTTP_200_OK)
 async def update_profile(
     form_data: UserUpdate,
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ):
     result = await update_profile_service(form_data, db, current_user)
     return result
@@ -73,18 +90,20 @@ async def update_profile(
 @router.post("/me", status_code=status.HTTP_200_OK)
 async def change_password(
     form_data: ChangePassword,
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ):
     result = await change_password_service(form_data, db, current_user)
     return result
 
 
-@router.post("/me/delete", status_code=status.HTTP_204_NO_CONTENT)
+@router.post(
+    "/me/delete", status_code=status.HTTP_202_ACCEPTED, response_class=Response
+)
 async def delete_profile(
     form_data: PasswordRequired,
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ):
     await delete_profile_service(form_data.password, db, current_user)
 
@@ -96,17 +115,26 @@ async def delete_profile(
     status_code=status.HTTP_200_OK,
 )
 async def get_users(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(required_role(Role.ADMIN))],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[Principal, Depends(required_role(Role.ADMIN))],
 ):
     result = await get_users_service(db, current_user)
     return result
 
 
-@router.delete("/admin", status_code=status.HTTP_204_NO_CONTENT)
+@router.get("/admin/export", status_code=status.HTTP_200_OK)
+async def export_users(
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[Principal, Depends(required_role(Role.ADMIN))],
+    format: ExportFormat = "ndjson",
+):
+    return export_response(export_users_service(db, format), format, "users")
+
+
+@router.delete("/admin", status_code=status.HTTP_202_ACCEPTED, response_class=Response)
 async def delete_user(
     user_id: UUID,
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(required_role(Role.ADMIN))],
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
+    current_user: Annotated[Principal, Depends(required_role(Role.ADMIN))],
 ):
     result = await delete_user_service(user_id, db, current_user)
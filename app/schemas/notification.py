@@ -1,3 +1,5 @@
+from datetime import datetime
+from typing import List
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -29,3 +31,35 @@ class NotificationResponse(NotificationBase):
     user: UserPublic
     post: PostPublic
     comment: CommentPublic
+    read_at: datetime | None = None
+
+
+class NotificationPage(BaseModel):
+    items: List[NotificationResponse]
+    next_cursor: str | None = None
+
+
+class NotificationSummary(BaseModel):
+    id: UUID
+    post_id: UUID
+    comment_id: UUID
+    message: str
+    notification_date: datetime
+    read_at: datetime | None = None
+    post_title: str
+    commenter_first_name: str
+    commenter_last_name: str
+
+
+class NotificationSummaryPage(BaseModel):
+    items: List[NotificationSummary]
+    next_cursor: str | None = None
+
+
+class NotificationMarkRead(BaseModel):
+    # Leave out to mark every notification as read
+    ids: List[UUID] | None = Field(default=None, max_length=1000)
+
+
+class UnreadCountResponse(BaseModel):
+    unread_count: int
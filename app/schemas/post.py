@@ -1,11 +1,11 @@
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List
 from uuid import UUID
 from pydantic import BaseModel, Field
 
 
 class PostBase(BaseModel):
-    title: str = Field(max_length=200)
+    title: str = Field(max_length=100)
     content: str
 
 
@@ -13,6 +13,17 @@ class PostCreate(PostBase):
     pass
 
 
+class PostBulkResult(BaseModel):
+    index: int
+    id: UUID | None = None
+    errors: List[Dict[str, Any]] | None = None
+
+
+class PostBulkResponse(BaseModel):
+    created: int
+    results: List[PostBulkResult]
+
+
 class UserPublic(BaseModel):
     first_name: str
     last_name: str
@@ -29,6 +40,12 @@ class PostResponse(PostBase):
     date_created: datetime
     author: UserPublic
     comments: List[CommentPublic]
+    comment_count: int | None = None
+
+
+class PostPage(BaseModel):
+    items: List[PostResponse]
+    next_cursor: str | None = None
 
 
 class PostUpdate(BaseModel):
@@ -46,6 +46,15 @@ class CommentPublic(BaseModel):
     post: PostPublic
 
 
+class Principal(BaseModel):
+    id: uuid.UUID
+    username: str
+    first_name: str
+    last_name: str
+    role: Role
+    token_version: int
+
+
 class TokenPublic(BaseModel):
     hashed_token: str
 
@@ -2,20 +2,36 @@ from uuid import UUID
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.export import (
+    ExportFormat,
+    csv_chunks,
+    ndjson_chunks,
+    stream_partitions,
+)
+from app.core.settings import settings
 from app.models.comment import Comment
-from app.models.user import User
 from app.repositories.comment import (
     create_comment_db,
     delete_comment_by_id_db,
+    admin_comments_stmt,
     get_all_comments_db,
     get_comment_by_id_db,
     get_my_comments_db,
     update_comment_db,
 )
-from app.repositories.notification import create_notification_db
-from app.schemas.comment import CommentCreate, CommentUpdate
-from app.services.notification import create_notification_service
-from app.services.post import get_post_service
+from app.schemas.comment import (
+    CommentCreate,
+    CommentResponse,
+    CommentUpdate,
+    PostPublic,
+    UserPublic,
+)
+from app.schemas.user import Principal
+from app.services.notification import (
+    create_notification_service,
+    send_notification_service,
+)
+from app.repositories.post import get_post_ref_db
 
 
 # ADMIN
@@ -24,6 +40,49 @@ async def get_comments_admin_service(db: AsyncSession):
     return comments
 
 
+def export_comments_admin_service(db: AsyncSession, format: ExportFormat):
+    partitions = stream_partitions(
+        admin_comments_stmt().order_by(Comment.id), db, settings.EXPORT_FETCH_SIZE
+    )
+
+    if format == "csv":
+        return csv_chunks(
+            partitions,
+            [
+                "id",
+                "message",
+                "author_first_name",
+                "author_last_name",
+                "post_title",
+                "post_content",
+                "post_author_first_name",
+                "post_author_last_name",
+            ],
+            tuple,
+        )
+
+    # Built without validation like the user export, one row that no longer
+    # fits the schema must not abort the stream
+    return ndjson_chunks(
+        partitions,
+        lambda row: CommentResponse.model_construct(
+            id=row.id,
+            message=row.message,
+            author=UserPublic.model_construct(
+                first_name=row.first_name, last_name=row.last_name
+            ),
+            post=PostPublic.model_construct(
+                title=row.title,
+                content=row.content,
+                author=UserPublic.model_construct(
+                    first_name=row.post_author_first_name,
+                    last_name=row.post_author_last_name,
+                ),
+            ),
+        ).model_dump_json(),
+    )
+
+
 async def delete_comment_admin_service(comment_id: UUID, db: AsyncSession):
     await delete_comment_by_id_db(comment_id, db)
 
@@ -32,21 +91,25 @@ async def create_comment_service(
     post_id: UUID,
     form_data: CommentCreate,
     db: AsyncSession,
-    current_user: User,
+    current_user: Principal,
 ):
-    post = await get_post_service(post_id, db, current_user)
-    comment = Comment(message=form_data.message, author=current_user, post=post)
+    post = await get_post_ref_db(post_id, db)
+    comment = Comment(
+        message=form_data.message, user_id=current_user.id, post_id=post.id
+    )
     new_comment = await create_comment_db(comment, db)
     loaded_comment = await get_comment_by_id_db(new_comment.id, db)
 
-    if current_user.id != post.author.id:
-        notification = create_notification_service(current_user, post, loaded_comment)
-        await create_notification_db(notification, db)
+    if current_user.id != post.user_id:
+        notification = create_notification_service(
+            current_user, post.id, post.user_id, loaded_comment
+        )
+        await send_notification_service(notification, db)
 
     return loaded_comment
 
 
-async def my_comments_service(db: AsyncSession, current_user: User):
+async def my_comments_service(db: AsyncSession, current_user: Principal):
     comments = await get_my_comments_db(current_user, db)
 
     return comments
@@ -59,7 +122,10 @@ async def get_comment_service(comment_id: UUID, db: AsyncSession):
 
 
 async def update_comment_service(
-    form_data: CommentUpdate, comment_id: UUID, db: AsyncSession, current_user: User
+    form_data: CommentUpdate,
+    comment_id: UUID,
+    db: AsyncSession,
+    current_user: Principal,
 ):
     comment = await get_comment_by_id_db(comment_id, db)
 
@@ -76,7 +142,7 @@ async def update_comment_service(
 
 
 async def delete_comment_service(
-    current_user: User, comment_id: UUID, db: AsyncSession
+    current_user: Principal, comment_id: UUID, db: AsyncSession
 ):
     comment = await get_comment_by_id_db(comment_id, db)
     if current_user.id != comment.user_id and current_user.id != comment.post.author.id:
@@ -85,5 +151,4 @@ async def delete_comment_service(
             detail="You are not allowed to delete this comment.",
         )
 
-    await db.delete(comment)
-    await db.commit()
+    await delete_comment_by_id_db(comment.id, db)
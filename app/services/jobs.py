@@ -0,0 +1,11 @@
+from app.core.jobs import JobQueue
+from app.core.settings import settings
+
+
+job_queue = JobQueue(
+    workers=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    backoff=settings.JOB_BACKOFF_SECONDS,
+    max_backoff=settings.JOB_MAX_BACKOFF_SECONDS,
+)
@@ -1,46 +1,158 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timezone
 from uuid import UUID
 
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.batch_writer import BatchWriter
+from app.core.database import on_commit
+from app.core.listener import PgListener
+from app.core.pagination import decode_cursor, paginate
+from app.core.settings import settings
+from app.services.jobs import job_queue
 from app.models.comment import Comment
-from app.models.notification import Notification
-from app.models.post import Post
-from app.models.user import User
+from app.models.notification import NOTIFICATION_CHANNEL, Notification
 from app.repositories.notification import (
     clear_all_notification_db,
+    count_unread_notification_db,
+    create_notification_db,
     delete_notification_by_id_db,
     get_all_notification_db,
     get_notification_by_id_db,
+    get_notification_summaries_db,
+    mark_notifications_read_db,
 )
+from app.schemas.notification import NotificationMarkRead
+from app.schemas.user import Principal
 
 
-def create_notification_service(current_user: User, post: Post, comment: Comment):
+notification_writer = BatchWriter(
+    Notification,
+    batch_size=settings.NOTIFICATION_BATCH_SIZE,
+    flush_interval=settings.NOTIFICATION_FLUSH_INTERVAL_SECONDS,
+    max_queue=settings.NOTIFICATION_QUEUE_SIZE,
+)
+
+notification_listener = PgListener(
+    NOTIFICATION_CHANNEL,
+    key="user_id",
+    queue_size=settings.NOTIFICATION_STREAM_QUEUE_SIZE,
+)
+
+
+def create_notification_service(
+    current_user: Principal, post_id: UUID, recipient_id: UUID, comment: Comment
+):
     message = (
         f"{current_user.first_name} { current_user.last_name } commented on your post"
     )
 
     notification = Notification(
+        id=uuid.uuid4(),
         message=message,
-        user_id=post.author.id,
-        post_id=post.id,
+        user_id=recipient_id,
+        post_id=post_id,
         comment_id=comment.id,
+        notification_date=datetime.now(timezone.utc),
     )
 
     return notification
 
 
-async def my_notifications_service(db: AsyncSession, current_user: User):
-    notifications = await get_all_notification_db(current_user, db)
+async def send_notification_service(notification: Notification, db: AsyncSession):
+    if settings.NOTIFICATION_DURABILITY == "sync":
+        await create_notification_db(notification, db)
+        return
 
-    return notifications
+    row = {
+        column.key: getattr(notification, column.key)
+        for column in Notification.__table__.columns
+    }
+    if settings.NOTIFICATION_DURABILITY == "job":
+        job_queue.enqueue(db, "notification.create", jsonable_encoder(row))
+        return
 
+    # Queued only after commit, the row references the comment being created
+    on_commit(db, notification_writer.enqueue, row)
+
+
+@job_queue.handler("notification.create")
+async def create_notification_job(payload: dict, db: AsyncSession):
+    row = {
+        "id": UUID(payload["id"]),
+        "message": payload["message"],
+        "user_id": UUID(payload["user_id"]),
+        "post_id": UUID(payload["post_id"]),
+        "comment_id": UUID(payload["comment_id"]),
+        "notification_date": datetime.fromisoformat(payload["notification_date"]),
+    }
+    # A retried job must not insert the notification twice
+    await db.execute(insert(Notification).values(row).on_conflict_do_nothing())
+
+
+async def my_notifications_service(
+    limit: int, cursor: str | None, db: AsyncSession, current_user: Principal
+):
+    after = decode_cursor(cursor) if cursor else None
+    notifications = await get_all_notification_db(current_user, limit, after, db)
 
-async def clear_notifications_service(db: AsyncSession, current_user: User):
+    return paginate(notifications, limit, sort_key="notification_date")
+
+
+async def notification_summaries_service(
+    limit: int, cursor: str | None, db: AsyncSession, current_user: Principal
+):
+    after = decode_cursor(cursor) if cursor else None
+    notifications = await get_notification_summaries_db(current_user, limit, after, db)
+
+    return paginate(notifications, limit, sort_key="notification_date")
+
+
+async def unread_count_service(db: AsyncSession, current_user: Principal):
+    unread_count = await count_unread_notification_db(current_user, db)
+
+    return {"unread_count": unread_count}
+
+
+async def mark_notifications_read_service(
+    form_data: NotificationMarkRead, db: AsyncSession, current_user: Principal
+):
+    await mark_notifications_read_db(current_user, form_data.ids, db)
+
+
+async def stream_notifications_service(request: Request, current_user: Principal):
+    queue = notification_listener.subscribe(current_user.id)
+    try:
+        while not await request.is_disconnected():
+            try:
+                notification = await asyncio.wait_for(
+                    queue.get(), settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+                )
+            except TimeoutError:
+                # Keeps proxies from closing the idle connection
+                yield ": ping\n\n"
+                continue
+
+            yield (
+                f"id: {notification['id']}\n"
+                "event: notification\n"
+                f"data: {json.dumps(notification)}\n\n"
+            )
+    finally:
+        notification_listener.unsubscribe(current_user.id, queue)
+
+
+async def clear_notifications_service(db: AsyncSession, current_user: Principal):
     await clear_all_notification_db(current_user, db)
 
 
 async def get_notification_service(
-    notification_id: UUID, db: AsyncSession, current_user: User
+    notification_id: UUID, db: AsyncSession, current_user: Principal
 ):
     notification = await get_notification_by_id_db(notification_id, db)
 
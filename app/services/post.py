@@ -1,23 +1,33 @@
 from uuid import UUID
 from fastapi import HTTPException, status
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import response_cache
+from app.core.etag import make_etag
+from app.core.pagination import decode_cursor, decode_rank_cursor, paginate
 from app.models.post import Post
-from app.models.user import User
 from app.repositories.post import (
     create_post_db,
+    create_posts_db,
     delete_post_admin_db,
     delete_post_db,
     feed_post_db,
+    feed_post_versions_db,
     get_all_post_db,
     get_post_by_id_db,
+    get_post_ref_db,
+    get_post_versions_db,
+    post_cache_key,
+    search_posts_db,
     update_post_db,
 )
-from app.schemas.post import PostCreate, PostUpdate
+from app.schemas.post import PostBulkResponse, PostCreate, PostResponse, PostUpdate
+from app.schemas.user import Principal
 
 
 async def create_post_service(
-    form_data: PostCreate, db: AsyncSession, current_user: User
+    form_data: PostCreate, db: AsyncSession, current_user: Principal
 ):
     data = form_data.model_dump()
     new_post = Post(**data)
@@ -28,22 +38,83 @@ async def create_post_service(
     return post
 
 
-async def my_posts_service(db: AsyncSession, current_user: User):
-    posts = await get_all_post_db(current_user.id, db)
+async def create_posts_bulk_service(
+    items: list, atomic: bool, db: AsyncSession, current_user: Principal
+):
+    # Items are validated one by one so a bad item, even one that is not an
+    # object at all, is reported on its own instead of failing the request
+    results = []
+    rows = []
+    for index, item in enumerate(items):
+        try:
+            post = PostCreate.model_validate(item)
+        except ValidationError as exc:
+            errors = exc.errors(
+                include_url=False, include_context=False, include_input=False
+            )
+            results.append({"index": index, "errors": errors})
+            continue
+
+        results.append({"index": index})
+        rows.append({**post.model_dump(), "user_id": current_user.id})
+
+    if atomic and len(rows) < len(items):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=PostBulkResponse(created=0, results=results).model_dump(),
+        )
+
+    ids = iter(await create_posts_db(rows, db) if rows else [])
+    for result in results:
+        if "errors" not in result:
+            result["id"] = next(ids)
 
-    return posts
+    return {"created": len(rows), "results": results}
+
+
+async def my_posts_service(
+    limit: int,
+    cursor: str | None,
+    comments_preview: int | None,
+    db: AsyncSession,
+    current_user: Principal,
+):
+    after = decode_cursor(cursor) if cursor else None
+    posts = await get_all_post_db(current_user.id, limit, after, comments_preview, db)
 
+    return paginate(posts, limit)
 
-async def get_post_service(post_id: UUID, db: AsyncSession, current_user: User):
+
+async def get_post_service(post_id: UUID, db: AsyncSession, current_user: Principal):
     post = await get_post_by_id_db(post_id, db)
 
     return post
 
 
+async def post_etag_service(post_id: UUID, db: AsyncSession) -> str | None:
+    versions = await get_post_versions_db(post_id, db)
+    if versions is None:
+        return None
+
+    return make_etag(tuple(versions))
+
+
+async def get_cached_post_service(post_id: UUID, etag: str) -> bytes | None:
+    return await response_cache.get(post_cache_key(post_id), etag)
+
+
+async def cache_post_service(post: Post, etag: str) -> bytes:
+    # Stored already rendered, a hit costs only the version lookup
+    body = PostResponse.model_validate(post, from_attributes=True).model_dump_json()
+    await response_cache.set(post_cache_key(post.id), etag, body.encode())
+
+    return body.encode()
+
+
 async def update_post_service(
-    form_data: PostUpdate, post_id: UUID, db: AsyncSession, current_user: User
+    form_data: PostUpdate, post_id: UUID, db: AsyncSession, current_user: Principal
 ):
-    post = await get_post_by_id_db(post_id, db)
+    post = await get_post_ref_db(post_id, db)
 
     if post.user_id != current_user.id:
         raise HTTPException(
@@ -51,27 +122,54 @@ async def update_post_service(
         )
 
     to_update = form_data.model_dump(exclude_unset=True)
+    await update_post_db(post_id, to_update, db)
 
-    updated_post = await update_post_db(to_update, post, db)
+    # Loaded after the UPDATE, the response is the state about to be committed
+    updated_post = await get_post_by_id_db(post_id, db)
 
     return updated_post
 
 
-async def delete_post_service(post_id: UUID, db: AsyncSession, current_user: User):
-    post = await get_post_by_id_db(post_id, db)
+async def delete_post_service(post_id: UUID, db: AsyncSession, current_user: Principal):
+    post = await get_post_ref_db(post_id, db)
     if current_user.id != post.user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You cannot delete this post as it's not yours",
         )
 
-    await delete_post_db(current_user, post, db)
+    await delete_post_db(post_id, db)
+
 
+async def feed_post_service(
+    limit: int, cursor: str | None, comments_preview: int | None, db: AsyncSession
+):
+    after = decode_cursor(cursor) if cursor else None
+    posts = await feed_post_db(limit, after, comments_preview, db)
 
-async def feed_post_service(db: AsyncSession):
-    posts = await feed_post_db(db)
+    return paginate(posts, limit)
+
+
+async def feed_post_etag_service(
+    limit: int, cursor: str | None, db: AsyncSession
+) -> str:
+    after = decode_cursor(cursor) if cursor else None
+    versions = await feed_post_versions_db(limit, after, db)
+
+    return make_etag(*(tuple(row) for row in versions))
+
+
+async def search_posts_service(
+    query: str,
+    limit: int,
+    cursor: str | None,
+    comments_preview: int | None,
+    db: AsyncSession,
+):
+    after = decode_rank_cursor(cursor) if cursor else None
+    posts = await search_posts_db(query, limit, after, comments_preview, db)
 
-    return posts
+    return paginate(posts, limit, sort_key="search_rank")
 
 
 async def delete_post_admin_service(post_id: UUID, db: AsyncSession):
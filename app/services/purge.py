@@ -0,0 +1,29 @@
+from app.core.purger import Purger
+from app.core.settings import settings
+from app.repositories.comment import (
+    purge_comments_of_deleted_posts_db,
+    purge_comments_of_deleted_users_db,
+)
+from app.repositories.notification import purge_notifications_of_deleted_users_db
+from app.repositories.post import (
+    mark_posts_of_deleted_users_db,
+    purge_deleted_posts_db,
+)
+from app.repositories.user import purge_deleted_users_db
+
+
+# Ordered so every DELETE only cascades into rows no earlier step could take
+# over in batches: comments go before their posts, posts before their authors
+purger = Purger(
+    [
+        mark_posts_of_deleted_users_db,
+        purge_comments_of_deleted_posts_db,
+        purge_comments_of_deleted_users_db,
+        purge_deleted_posts_db,
+        purge_notifications_of_deleted_users_db,
+        purge_deleted_users_db,
+    ],
+    batch_size=settings.PURGE_BATCH_SIZE,
+    pause=settings.PURGE_PAUSE_SECONDS,
+    interval=settings.PURGE_INTERVAL_SECONDS,
+)
@@ -4,30 +4,64 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.database import on_commit
+from app.core.etag import make_etag
+from app.core.export import (
+    ExportFormat,
+    csv_chunks,
+    ndjson_chunks,
+    stream_partitions,
+)
+from app.core.settings import settings
 from app.models.user import User
 from app.repositories.user import (
+    all_users_stmt,
     change_password_db,
     check_username_exist,
     create_user_db,
     delete_user_db,
     get_all_user,
+    get_user_activity_db,
+    get_user_activity_versions_db,
+    get_user_by_id_db,
     get_user_by_username,
+    invalidate_principal,
+    update_password_hash_db,
     update_user_partial_db,
 )
-from app.schemas.user import ChangePassword, UserCreate, UserUpdate
-from app.core.security import create_access_token, hash_password, verify_password
+from app.schemas.user import (
+    ChangePassword,
+    Principal,
+    UserCreate,
+    UserOnlyResponse,
+    UserUpdate,
+)
+from app.core.security import (
+    create_access_token,
+    hash_password_async,
+    verify_and_update_password_async,
+    verify_password_async,
+)
 
 
 async def sign_in_service(form_data: OAuth2PasswordRequestForm, db: AsyncSession):
     user = await get_user_by_username(form_data.username, db)
 
-    if not verify_password(form_data.password, user.password):
+    valid, updated_hash = await verify_and_update_password_async(
+        form_data.password, user.password
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Username or password is not correct",
         )
 
-    access_token = create_access_token({"sub": str(user.id)})
+    if updated_hash:
+        await update_password_hash_db(updated_hash, user, db)
+
+    access_token = create_access_token(
+        {"sub": str(user.id), "role": user.role.value, "ver": user.token_version}
+    )
 
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -42,7 +76,7 @@ async def sign_up_service(form_data: UserCreate, db: AsyncSession):
             status_code=status.HTTP_400_BAD_REQUEST, detail="Username already exist"
         )
 
-    hashed_pwd = hash_password(form_data.password)
+    hashed_pwd = await hash_password_async(form_data.password)
     form_data.password = hashed_pwd
 
     data = form_data.model_dump()
@@ -53,27 +87,36 @@ async def sign_up_service(form_data: UserCreate, db: AsyncSession):
 
 
 # DB is included if in future is in need here
-async def my_profile_service(db: AsyncSession, current_user: User):
-    return current_user
+async def my_profile_service(db: AsyncSession, current_user: Principal):
+    user = await get_user_activity_db(current_user.id, db)
+
+    return user
+
+
+async def my_profile_etag_service(db: AsyncSession, current_user: Principal) -> str:
+    versions = await get_user_activity_versions_db(current_user.id, db)
+
+    return make_etag(current_user.id, versions and tuple(versions))
 
 
 async def update_profile_service(
-    form_data: UserUpdate, db: AsyncSession, current_user: User
+    form_data: UserUpdate, db: AsyncSession, current_user: Principal
 ):
     if form_data.username:
         await check_username_exist(form_data.username, db)
 
-    user = await get_user_by_username(current_user.username, db)
+    user = await get_user_by_id_db(current_user.id, db)
 
     data = form_data.model_dump(exclude_unset=True)
 
     user = await update_user_partial_db(data, user, db)
+    on_commit(db, invalidate_principal, user.id)
 
     return user
 
 
 async def change_password_service(
-    form_data: ChangePassword, db: AsyncSession, current_user: User
+    form_data: ChangePassword, db: AsyncSession, current_user: Principal
 ):
     if form_data.new_password != form_data.confirm_password:
         raise HTTPException(
@@ -86,39 +129,69 @@ async def change_password_service(
             detail="You cannot have the same current password and new password",
         )
 
-    if not verify_password(form_data.current_password, current_user.password):
+    user = await get_user_by_id_db(current_user.id, db)
+
+    if not await verify_password_async(form_data.current_password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Password is not correct"
         )
 
-    hashed_pwd = hash_password(form_data.new_password)
+    hashed_pwd = await hash_password_async(form_data.new_password)
 
-    await change_password_db(hashed_pwd, current_user, db)
+    await change_password_db(hashed_pwd, user, db)
+    on_commit(db, invalidate_principal, user.id)
 
     return {"message": "You've successfully changed your password"}
 
 
-async def delete_profile_service(password: str, db: AsyncSession, current_user: User):
-    if not verify_password(password, current_user.password):
+async def delete_profile_service(
+    password: str, db: AsyncSession, current_user: Principal
+):
+    user = await get_user_by_id_db(current_user.id, db)
+
+    if not await verify_password_async(password, user.password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Password is not correct"
         )
 
-    await delete_user_db(current_user, db)
+    await delete_user_db(user, db)
+    on_commit(db, invalidate_principal, user.id)
 
 
 # ADMIN
-async def get_users_service(db: AsyncSession, current_user: User):
+async def get_users_service(db: AsyncSession, current_user: Principal):
     users = await get_all_user(db)
     return users
 
 
-async def delete_user_service(user_id: UUID, db: AsyncSession, current_user: User):
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalars().first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+def export_users_service(db: AsyncSession, format: ExportFormat):
+    partitions = stream_partitions(
+        all_users_stmt().order_by(User.id), db, settings.EXPORT_FETCH_SIZE
+    )
+
+    if format == "csv":
+        return csv_chunks(
+            partitions,
+            ["id", "first_name", "last_name", "username", "role"],
+            lambda row: (
+                row.id,
+                row.first_name,
+                row.last_name,
+                row.username,
+                row.role.value,
+            ),
         )
 
+    # Built without validation, UserBase carries sign-up constraints that
+    # older rows may not meet and one such row must not abort the stream
+    return ndjson_chunks(
+        partitions,
+        lambda row: UserOnlyResponse.model_construct(**row._mapping).model_dump_json(),
+    )
+
+
+async def delete_user_service(user_id: UUID, db: AsyncSession, current_user: Principal):
+    user = await get_user_by_id_db(user_id, db)
+
     await delete_user_db(user, db)
+    on_commit(db, invalidate_principal, user.id)
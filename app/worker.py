@@ -0,0 +1,39 @@
+"""Run job workers without the HTTP server.
+
+Start with `python -m app.worker --workers 4`. Set JOB_WORKERS=0 for the API
+processes when the jobs should only run here.
+"""
+
+import argparse
+import asyncio
+import signal
+
+from app.core.database import engine
+from app.services.jobs import job_queue
+
+# Imported for the handlers they register on job_queue
+import app.services.notification  # noqa: F401
+
+
+async def run(workers: int):
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await job_queue.start(workers)
+    await stopping.wait()
+    await job_queue.stop()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=max(job_queue.workers, 1))
+    args = parser.parse_args()
+
+    asyncio.run(run(args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""add read_at to notifications
+
+Revision ID: 1c6e8b3f9a20
+Revises: f4a9c2d7e1b5
+Create Date: 2026-10-18 21:32:48.902116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c6e8b3f9a20'
+down_revision: Union[str, Sequence[str], None] = 'f4a9c2d7e1b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notifications', sa.Column('read_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_notifications_user_id_unread', 'notifications', ['user_id'], unique=False, postgresql_where=sa.text('read_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_user_id_unread', table_name='notifications', postgresql_where=sa.text('read_at IS NULL'))
+    op.drop_column('notifications', 'read_at')
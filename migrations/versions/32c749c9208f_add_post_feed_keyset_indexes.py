@@ -0,0 +1,30 @@
+"""add post feed keyset indexes
+
+Revision ID: 32c749c9208f
+Revises: 880acc01eaa8
+Create Date: 2026-10-18 09:12:41.204517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '32c749c9208f'
+down_revision: Union[str, Sequence[str], None] = '880acc01eaa8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_posts_date_created_id', 'posts', ['date_created', 'id'], unique=False)
+    op.create_index('ix_posts_user_id_date_created_id', 'posts', ['user_id', 'date_created', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_user_id_date_created_id', table_name='posts')
+    op.drop_index('ix_posts_date_created_id', table_name='posts')
@@ -0,0 +1,44 @@
+"""soft delete users and posts
+
+Revision ID: 3e8d5b1f6c27
+Revises: 9a4c1e7b3d52
+Create Date: 2026-10-18 23:31:07.415236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8d5b1f6c27'
+down_revision: Union[str, Sequence[str], None] = '9a4c1e7b3d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('posts', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.drop_index('ix_posts_user_id_date_created_id', table_name='posts')
+    op.drop_index('ix_posts_date_created_id', table_name='posts')
+    op.create_index('ix_posts_date_created_id', 'posts', ['date_created', 'id'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_posts_user_id_date_created_id', 'posts', ['user_id', 'date_created', 'id'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index(op.f('ix_posts_user_id'), 'posts', ['user_id'], unique=False)
+    op.create_index('ix_posts_deleted_at', 'posts', ['deleted_at'], unique=False, postgresql_where=sa.text('deleted_at IS NOT NULL'))
+    op.create_index('ix_users_deleted_at', 'users', ['deleted_at'], unique=False, postgresql_where=sa.text('deleted_at IS NOT NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_deleted_at', table_name='users', postgresql_where=sa.text('deleted_at IS NOT NULL'))
+    op.drop_index('ix_posts_deleted_at', table_name='posts', postgresql_where=sa.text('deleted_at IS NOT NULL'))
+    op.drop_index(op.f('ix_posts_user_id'), table_name='posts')
+    op.drop_index('ix_posts_user_id_date_created_id', table_name='posts', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.drop_index('ix_posts_date_created_id', table_name='posts', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_posts_date_created_id', 'posts', ['date_created', 'id'], unique=False)
+    op.create_index('ix_posts_user_id_date_created_id', 'posts', ['user_id', 'date_created', 'id'], unique=False)
+    op.drop_column('posts', 'deleted_at')
+    op.drop_column('users', 'deleted_at')
@@ -0,0 +1,28 @@
+"""add comment preview index
+
+Revision ID: 5d1e0b7a94c2
+Revises: 32c749c9208f
+Create Date: 2026-10-18 10:03:27.518094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d1e0b7a94c2'
+down_revision: Union[str, Sequence[str], None] = '32c749c9208f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_comments_post_id_date_created_id', 'comments', ['post_id', 'date_created', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_comments_post_id_date_created_id', table_name='comments')
@@ -0,0 +1,43 @@
+"""add jobs table
+
+Revision ID: 6b2f9d4e8a13
+Revises: 3e8d5b1f6c27
+Create Date: 2026-10-18 23:58:42.106381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b2f9d4e8a13'
+down_revision: Union[str, Sequence[str], None] = '3e8d5b1f6c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('kind', sa.String(length=100), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('status', sa.Enum('QUEUED', 'FAILED', name='job_status'), server_default='QUEUED', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('run_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_run_at_queued', 'jobs', ['run_at'], unique=False, postgresql_where=sa.text("status = 'QUEUED'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_run_at_queued', table_name='jobs', postgresql_where=sa.text("status = 'QUEUED'"))
+    op.drop_table('jobs')
+    sa.Enum(name='job_status').drop(op.get_bind())
@@ -0,0 +1,32 @@
+"""add updated_at and version columns
+
+Revision ID: 7d3f5a9e2c84
+Revises: 1c6e8b3f9a20
+Create Date: 2026-10-18 22:14:03.557210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3f5a9e2c84'
+down_revision: Union[str, Sequence[str], None] = '1c6e8b3f9a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('users', 'posts', 'comments'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('comments', 'posts', 'users'):
+        op.drop_column(table, 'version')
+        op.drop_column(table, 'updated_at')
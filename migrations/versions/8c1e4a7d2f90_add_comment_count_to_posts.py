@@ -0,0 +1,40 @@
+"""add comment_count to posts
+
+Revision ID: 8c1e4a7d2f90
+Revises: 6b2f9d4e8a13
+Create Date: 2026-10-19 10:12:36.548120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1e4a7d2f90'
+down_revision: Union[str, Sequence[str], None] = '6b2f9d4e8a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        """
+        UPDATE posts SET comment_count = counts.count
+        FROM (
+            SELECT comments.post_id, count(*) AS count
+            FROM comments JOIN users ON users.id = comments.user_id
+            WHERE users.deleted_at IS NULL
+            GROUP BY comments.post_id
+        ) AS counts
+        WHERE posts.id = counts.post_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('posts', 'comment_count')
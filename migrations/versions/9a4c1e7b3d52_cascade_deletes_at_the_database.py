@@ -0,0 +1,42 @@
+"""cascade deletes at the database
+
+Revision ID: 9a4c1e7b3d52
+Revises: 7d3f5a9e2c84
+Create Date: 2026-10-18 22:48:19.730644
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c1e7b3d52'
+down_revision: Union[str, Sequence[str], None] = '7d3f5a9e2c84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FOREIGN_KEYS = [
+    ('posts', 'user_id', 'users'),
+    ('comments', 'user_id', 'users'),
+    ('comments', 'post_id', 'posts'),
+    ('notifications', 'user_id', 'users'),
+    ('notifications', 'post_id', 'posts'),
+    ('notifications', 'comment_id', 'comments'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column, referred in FOREIGN_KEYS:
+        op.drop_constraint(f'{table}_{column}_fkey', table, type_='foreignkey')
+        op.create_foreign_key(f'{table}_{column}_fkey', table, referred, [column], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column, referred in FOREIGN_KEYS:
+        op.drop_constraint(f'{table}_{column}_fkey', table, type_='foreignkey')
+        op.create_foreign_key(f'{table}_{column}_fkey', table, referred, [column], ['id'])
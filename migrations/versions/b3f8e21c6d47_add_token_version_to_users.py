@@ -0,0 +1,28 @@
+"""add token version to users
+
+Revision ID: b3f8e21c6d47
+Revises: 5d1e0b7a94c2
+Create Date: 2026-10-18 11:26:05.730941
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f8e21c6d47'
+down_revision: Union[str, Sequence[str], None] = '5d1e0b7a94c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
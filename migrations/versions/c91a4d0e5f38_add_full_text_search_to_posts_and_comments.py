@@ -0,0 +1,35 @@
+"""add full text search to posts and comments
+
+Revision ID: c91a4d0e5f38
+Revises: b3f8e21c6d47
+Create Date: 2026-10-18 13:41:52.086310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c91a4d0e5f38'
+down_revision: Union[str, Sequence[str], None] = 'b3f8e21c6d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('english', coalesce(title, '') || ' ' || coalesce(content, ''))", persisted=True), nullable=True))
+    op.add_column('comments', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('english', coalesce(message, ''))", persisted=True), nullable=True))
+    op.create_index('ix_posts_search_vector', 'posts', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_comments_search_vector', 'comments', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_comments_search_vector', table_name='comments', postgresql_using='gin')
+    op.drop_index('ix_posts_search_vector', table_name='posts', postgresql_using='gin')
+    op.drop_column('comments', 'search_vector')
+    op.drop_column('posts', 'search_vector')
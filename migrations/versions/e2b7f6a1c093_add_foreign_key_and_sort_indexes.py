@@ -0,0 +1,34 @@
+"""add foreign key and sort indexes
+
+Revision ID: e2b7f6a1c093
+Revises: c91a4d0e5f38
+Create Date: 2026-10-18 14:20:37.661824
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7f6a1c093'
+down_revision: Union[str, Sequence[str], None] = 'c91a4d0e5f38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_comments_user_id'), 'comments', ['user_id'], unique=False)
+    op.create_index('ix_notifications_user_id_notification_date_id', 'notifications', ['user_id', 'notification_date', 'id'], unique=False)
+    op.create_index(op.f('ix_notifications_post_id'), 'notifications', ['post_id'], unique=False)
+    op.create_index(op.f('ix_notifications_comment_id'), 'notifications', ['comment_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_notifications_comment_id'), table_name='notifications')
+    op.drop_index(op.f('ix_notifications_post_id'), table_name='notifications')
+    op.drop_index('ix_notifications_user_id_notification_date_id', table_name='notifications')
+    op.drop_index(op.f('ix_comments_user_id'), table_name='comments')
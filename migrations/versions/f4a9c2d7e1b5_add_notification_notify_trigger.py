@@ -0,0 +1,47 @@
+"""add notification notify trigger
+
+Revision ID: f4a9c2d7e1b5
+Revises: e2b7f6a1c093
+Create Date: 2026-10-18 21:05:12.418390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a9c2d7e1b5'
+down_revision: Union[str, Sequence[str], None] = 'e2b7f6a1c093'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_notification_created() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('notifications', json_build_object(
+                'id', NEW.id,
+                'user_id', NEW.user_id,
+                'post_id', NEW.post_id,
+                'comment_id', NEW.comment_id,
+                'message', NEW.message,
+                'notification_date', NEW.notification_date
+            )::text);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        'CREATE TRIGGER notifications_notify AFTER INSERT ON notifications '
+        'FOR EACH ROW EXECUTE FUNCTION notify_notification_created()'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS notifications_notify ON notifications')
+    op.execute('DROP FUNCTION IF EXISTS notify_notification_created()')
@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+# Settings are read at import time, so the required ones get test values
+# before anything from `app` is imported. The database suite under tests/db
+# runs against TEST_DATABASE_URL and is skipped without it. It drops every
+# table, so the app is pointed at that database whatever DATABASE_URL says.
+if os.environ.get("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+else:
+    os.environ.setdefault(
+        "DATABASE_URL", "postgresql+asyncpg://postgres@localhost/blog_test"
+    )
+os.environ.setdefault("ACCESS_SECRET_KEY", "test-access-secret")
+os.environ.setdefault("REFRESH_SECRET_KEY", "test-refresh-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_EXPIRE_DAYS", "7")
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
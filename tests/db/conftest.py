@@ -0,0 +1,185 @@
+import os
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.database import Base, engine
+from app.models.comment import Comment
+from app.models.notification import Notification
+from app.models.post import Post
+from app.models.user import Role, User
+from app.schemas.user import Principal
+
+
+USERS = 200
+POSTS_PER_USER = 10
+COMMENTS_PER_POST = 5
+
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do".split()
+# Every text also gets one of these, each one matches only a handful of rows
+RARE_TERMS = 2000
+
+
+def pytest_collection_modifyitems(items):
+    if os.environ.get("TEST_DATABASE_URL"):
+        return
+
+    skip = pytest.mark.skip(reason="TEST_DATABASE_URL is not set")
+    for item in items:
+        if "tests/db/" in item.nodeid:
+            item.add_marker(skip)
+
+
+def sentence(rng: random.Random, length: int) -> str:
+    words = [rng.choice(WORDS) for _ in range(length)]
+    words.insert(rng.randrange(length), f"term{rng.randrange(RARE_TERMS):04d}")
+
+    return " ".join(words)
+
+
+async def seed_database() -> SimpleNamespace:
+    rng = random.Random(0)
+    now = datetime.now(timezone.utc)
+
+    users = [
+        {
+            "id": uuid.uuid4(),
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "username": f"user{i:04d}",
+            "password": "not-a-hash",
+            "role": Role.USER,
+            "deleted_at": now if i % 10 == 9 else None,
+        }
+        for i in range(USERS)
+    ]
+    posts = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user["id"],
+            "title": sentence(rng, 4),
+            "content": sentence(rng, 40),
+            "date_created": now - timedelta(minutes=rng.randrange(100_000)),
+            "deleted_at": now if rng.random() < 0.05 else None,
+            "comment_count": COMMENTS_PER_POST,
+        }
+        for user in users
+        for _ in range(POSTS_PER_USER)
+    ]
+    comments = [
+        {
+            "id": uuid.uuid4(),
+            "post_id": post["id"],
+            "user_id": rng.choice(users)["id"],
+            "message": sentence(rng, 12),
+            "date_created": post["date_created"] + timedelta(minutes=i),
+        }
+        for post in posts
+        for i in range(COMMENTS_PER_POST)
+    ]
+    author_of = {post["id"]: post["user_id"] for post in posts}
+    notifications = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": author_of[comment["post_id"]],
+            "post_id": comment["post_id"],
+            "comment_id": comment["id"],
+            "message": "New comment on your post",
+            "notification_date": comment["date_created"],
+            "read_at": now if rng.random() < 0.5 else None,
+        }
+        for comment in comments[::2]
+    ]
+
+    async with engine.begin() as conn:
+        for model, rows in (
+            (User, users),
+            (Post, posts),
+            (Comment, comments),
+            (Notification, notifications),
+        ):
+            await conn.execute(insert(model), rows)
+
+    user = users[0]
+    deleted_users = {user["id"] for user in users if user["deleted_at"]}
+    post_of = {post["id"]: post for post in posts}
+    comment_of = {comment["id"]: comment for comment in comments}
+
+    def post_is_live(post_id) -> bool:
+        post = post_of[post_id]
+        return post["deleted_at"] is None and post["user_id"] not in deleted_users
+
+    def commenter_is_live(comment_id) -> bool:
+        return comment_of[comment_id]["user_id"] not in deleted_users
+
+    live_posts = sorted(
+        (post for post in posts if post_is_live(post["id"])),
+        key=lambda post: (post["date_created"], post["id"]),
+        reverse=True,
+    )
+    post = next(post for post in live_posts if post["user_id"] == user["id"])
+    comment = next(
+        comment
+        for comment in comments
+        if comment["post_id"] == post["id"] and commenter_is_live(comment["id"])
+    )
+    notification = next(
+        notification
+        for notification in notifications
+        if post_is_live(notification["post_id"])
+        and commenter_is_live(notification["comment_id"])
+    )
+    # Still stored but hidden, the purger has not run yet
+    of_deleted_post = next(
+        notification
+        for notification in notifications
+        if post_of[notification["post_id"]]["deleted_at"] is not None
+    )
+    of_deleted_commenter = next(
+        notification
+        for notification in notifications
+        if post_is_live(notification["post_id"])
+        and not commenter_is_live(notification["comment_id"])
+    )
+
+    return SimpleNamespace(
+        principal=Principal(
+            id=user["id"],
+            username=user["username"],
+            first_name=user["first_name"],
+            last_name=user["last_name"],
+            role=Role.USER,
+            token_version=0,
+        ),
+        deleted_user_id=next(iter(deleted_users)),
+        post_id=post["id"],
+        rare_term="term0042",
+        comment_id=comment["id"],
+        notification_id=notification["id"],
+        hidden_notification_ids=[of_deleted_post["id"], of_deleted_commenter["id"]],
+        # Keyset position halfway down the feed
+        after=(live_posts[100]["date_created"], live_posts[100]["id"]),
+    )
+
+
+@pytest.fixture(scope="session")
+async def seed(anyio_backend):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    seed = await seed_database()
+
+    # What autovacuum would have done by now: planner statistics, and GIN
+    # pending lists merged so full text matches are priced like in production
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.exec_driver_sql("VACUUM ANALYZE")
+
+    yield seed
+
+    await engine.dispose()
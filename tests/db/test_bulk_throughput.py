@@ -0,0 +1,50 @@
+import time
+
+import pytest
+from sqlalchemy import delete
+
+from app.core.database import AsyncSessionLocal
+from app.models.post import Post
+from app.schemas.post import PostCreate
+from app.services.post import create_post_service, create_posts_bulk_service
+
+
+ITEMS = 500
+
+TITLE = "Imported"
+
+
+def items() -> list[dict]:
+    return [{"title": TITLE, "content": f"Imported post {i}"} for i in range(ITEMS)]
+
+
+@pytest.fixture
+async def cleanup(seed):
+    yield
+
+    async with AsyncSessionLocal() as db, db.begin():
+        await db.execute(delete(Post).where(Post.title == TITLE))
+
+
+@pytest.mark.anyio
+async def test_bulk_create_is_ten_times_faster(seed, cleanup):
+    # What an importer does today: one request, so one transaction, per post
+    started_at = time.perf_counter()
+    for item in items():
+        async with AsyncSessionLocal() as db, db.begin():
+            await create_post_service(
+                PostCreate.model_validate(item), db, seed.principal
+            )
+    single = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    async with AsyncSessionLocal() as db, db.begin():
+        result = await create_posts_bulk_service(
+            items(), atomic=False, db=db, current_user=seed.principal
+        )
+    bulk = time.perf_counter() - started_at
+
+    assert result["created"] == ITEMS
+    assert (
+        single / bulk >= 10
+    ), f"{ITEMS} posts: {single:.3f}s one by one, {bulk:.3f}s bulk"
@@ -0,0 +1,144 @@
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import delete, event, func, insert, select
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models.comment import Comment
+from app.models.notification import Notification
+from app.models.post import Post
+from app.repositories.post import delete_post_admin_db, delete_post_db
+from app.services.purge import purger
+
+
+COMMENTS = 5000
+BATCH_SIZE = 500
+RUNS = 5
+
+
+@contextmanager
+def counted_statements():
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+
+async def create_post(user_id, comments: int) -> uuid.UUID:
+    post_id = uuid.uuid4()
+    comment_ids = [uuid.uuid4() for _ in range(comments)]
+
+    async with AsyncSessionLocal() as db, db.begin():
+        await db.execute(
+            insert(Post),
+            [{"id": post_id, "user_id": user_id, "title": "Busy", "content": "x"}],
+        )
+        if comments:
+            await db.execute(
+                insert(Comment),
+                [
+                    {"id": id, "post_id": post_id, "user_id": user_id, "message": "y"}
+                    for id in comment_ids
+                ],
+            )
+            await db.execute(
+                insert(Notification),
+                [
+                    {
+                        "post_id": post_id,
+                        "comment_id": id,
+                        "user_id": user_id,
+                        "message": "New comment on your post",
+                    }
+                    for id in comment_ids
+                ],
+            )
+
+    return post_id
+
+
+@pytest.fixture
+async def posts(seed):
+    posts = {
+        "empty": await create_post(seed.principal.id, 0),
+        "busy": await create_post(seed.principal.id, COMMENTS),
+    }
+
+    yield posts
+
+    async with AsyncSessionLocal() as db, db.begin():
+        await db.execute(delete(Post).where(Post.id.in_(posts.values())))
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("post", ["empty", "busy"])
+@pytest.mark.parametrize("delete_db", [delete_post_db, delete_post_admin_db])
+async def test_post_delete_is_one_statement(posts, post, delete_db):
+    async with AsyncSessionLocal() as db:
+        await db.connection()
+        with counted_statements() as statements:
+            await delete_db(posts[post], db)
+        await db.rollback()
+
+    assert len(statements) == 1, statements
+
+
+async def timed(query) -> float:
+    async with AsyncSessionLocal() as db:
+        await db.connection()
+        started_at = time.perf_counter()
+        await query(db)
+        elapsed = time.perf_counter() - started_at
+        await db.rollback()
+
+    return elapsed
+
+
+@pytest.mark.anyio
+async def test_soft_delete_and_purge_batches_beat_cascade(posts):
+    post_id = posts["busy"]
+
+    async def cascade(db):
+        await db.execute(delete(Post).where(Post.id == post_id))
+
+    cascade_seconds = statistics.median([await timed(cascade) for _ in range(RUNS)])
+    soft_seconds = statistics.median(
+        [await timed(lambda db: delete_post_db(post_id, db)) for _ in range(RUNS)]
+    )
+
+    # The purger's work, one short transaction per batch in production. Run
+    # in one rolled back transaction here, timed batch by batch
+    batch_seconds = []
+    async with AsyncSessionLocal() as db:
+        await delete_post_db(post_id, db)
+        for step in purger.steps:
+            while True:
+                started_at = time.perf_counter()
+                count = await step(BATCH_SIZE, db)
+                batch_seconds.append(time.perf_counter() - started_at)
+                if count < BATCH_SIZE:
+                    break
+
+        remaining = await db.scalar(
+            select(func.count()).where(Comment.post_id == post_id)
+        )
+        await db.rollback()
+
+    report = (
+        f"post with {COMMENTS} comments: cascade {cascade_seconds * 1000:.1f}ms, "
+        f"soft delete {soft_seconds * 1000:.1f}ms, purge {len(batch_seconds)} "
+        f"batches, slowest {max(batch_seconds) * 1000:.1f}ms, "
+        f"total {sum(batch_seconds) * 1000:.1f}ms"
+    )
+    assert remaining == 0
+    assert soft_seconds < cascade_seconds, report
+    assert max(batch_seconds) < cascade_seconds, report
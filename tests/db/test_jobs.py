@@ -0,0 +1,148 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.core.database import AsyncSessionLocal
+from app.core.jobs import JobQueue
+from app.models.job import Job, JobStatus
+
+
+def make_queue(**kwargs) -> JobQueue:
+    options = {
+        "workers": 1,
+        "poll_interval": 0.05,
+        "max_attempts": 3,
+        "backoff": 10,
+        "max_backoff": 60,
+    }
+    return JobQueue(**(options | kwargs))
+
+
+@pytest.fixture
+async def jobs(seed):
+    async def enqueue(queue: JobQueue, kind: str, payloads: list[dict], **kwargs):
+        async with AsyncSessionLocal() as db, db.begin():
+            for payload in payloads:
+                queue.enqueue(db, kind, payload, **kwargs)
+
+    yield enqueue
+
+    async with AsyncSessionLocal() as db, db.begin():
+        await db.execute(delete(Job))
+
+
+async def stored_jobs() -> list[Job]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Job))
+        return list(result.scalars())
+
+
+@pytest.mark.anyio
+async def test_concurrent_workers_run_each_job_once(jobs):
+    ran = Counter()
+    workers = [make_queue(), make_queue()]
+    for worker_id, queue in enumerate(workers):
+
+        @queue.handler("index")
+        async def index(payload, db, worker_id=worker_id):
+            ran[payload["n"], worker_id] += 1
+            # Holds the row lock while the other worker claims
+            await asyncio.sleep(0.01)
+
+    await jobs(workers[0], "index", [{"n": n} for n in range(20)])
+
+    async def drain(queue: JobQueue):
+        while await queue.work_once():
+            pass
+
+    await asyncio.gather(*(drain(queue) for queue in workers))
+
+    assert sorted(n for n, _ in ran) == list(range(20))
+    assert set(ran.values()) == {1}
+    # SKIP LOCKED let both make progress instead of queueing on one row
+    assert {worker_id for _, worker_id in ran} == {0, 1}
+    assert await stored_jobs() == []
+    assert sum(queue.counts["done"] for queue in workers) == 20
+
+
+@pytest.mark.anyio
+async def test_failed_job_is_retried_with_backoff(jobs):
+    queue = make_queue(backoff=10)
+    calls = []
+
+    @queue.handler("flaky")
+    async def flaky(payload, db):
+        calls.append(payload)
+        raise RuntimeError("boom")
+
+    await jobs(queue, "flaky", [{"n": 1}])
+
+    before = datetime.now(timezone.utc)
+    assert await queue.work_once() is True
+    # Rescheduled, so not due yet
+    assert await queue.work_once() is False
+
+    [job] = await stored_jobs()
+    assert calls == [{"n": 1}]
+    assert job.status == JobStatus.QUEUED
+    assert job.attempts == 1
+    assert "boom" in job.last_error
+    assert before + timedelta(seconds=9) < job.run_at
+    assert job.run_at < before + timedelta(seconds=11)
+    assert queue.counts["retried"] == 1
+
+
+@pytest.mark.anyio
+async def test_job_fails_for_good_after_max_attempts(jobs):
+    queue = make_queue()
+
+    @queue.handler("broken")
+    async def broken(payload, db):
+        raise RuntimeError("still broken")
+
+    await jobs(queue, "broken", [{"n": 1}], max_attempts=1)
+
+    assert await queue.work_once() is True
+    assert await queue.work_once() is False
+
+    [job] = await stored_jobs()
+    assert job.status == JobStatus.FAILED
+    assert job.attempts == 1
+    assert "still broken" in job.last_error
+    assert queue.counts["failed"] == 1
+
+
+@pytest.mark.anyio
+async def test_failed_handler_writes_are_rolled_back(jobs):
+    queue = make_queue()
+
+    @queue.handler("partial")
+    async def partial(payload, db):
+        queue.enqueue(db, "follow_up", {})
+        await db.flush()
+        raise RuntimeError("boom")
+
+    await jobs(queue, "partial", [{}])
+
+    assert await queue.work_once() is True
+
+    assert [job.kind for job in await stored_jobs()] == ["partial"]
+
+
+@pytest.mark.anyio
+async def test_unknown_kinds_stay_queued(jobs):
+    queue = make_queue()
+
+    @queue.handler("known")
+    async def known(payload, db):
+        pass
+
+    await jobs(queue, "unknown", [{}])
+
+    assert await queue.work_once() is False
+
+    [job] = await stored_jobs()
+    assert (job.kind, job.attempts, job.status) == ("unknown", 0, JobStatus.QUEUED)
@@ -0,0 +1,191 @@
+import json
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, text
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models.comment import Comment
+from app.repositories.comment import (
+    create_comment_db,
+    delete_comment_by_id_db,
+    get_comment_by_id_db,
+    get_my_comments_db,
+)
+from app.repositories.notification import (
+    count_unread_notification_db,
+    get_all_notification_db,
+    get_notification_by_id_db,
+    get_notification_summaries_db,
+    mark_notifications_read_db,
+)
+from app.repositories.post import (
+    delete_post_db,
+    feed_post_db,
+    feed_post_versions_db,
+    get_all_post_db,
+    get_post_by_id_db,
+    get_post_ref_db,
+    get_post_versions_db,
+    search_posts_db,
+    update_post_db,
+)
+from app.repositories.user import (
+    delete_user_db,
+    get_user_activity_db,
+    get_user_activity_versions_db,
+    get_user_by_id_db,
+    get_user_by_username,
+    update_user_partial_db,
+)
+from app.services.purge import purger
+
+
+# Tables that grow with usage, none of them may be read front to back
+LARGE_TABLES = {"users", "posts", "comments", "notifications"}
+
+EXPLAINED = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+
+@contextmanager
+def recorded_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(EXPLAINED):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+def seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan["Node Type"] == "Seq Scan" and plan["Relation Name"] in LARGE_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+
+    return found
+
+
+async def user_activity(seed, db):
+    await get_user_activity_db(seed.principal.id, db)
+    await get_user_activity_versions_db(seed.principal.id, db)
+
+
+async def rename_user(seed, db):
+    user = await get_user_by_id_db(seed.principal.id, db)
+    await update_user_partial_db({"first_name": "Renamed"}, user, db)
+
+
+async def delete_user(seed, db):
+    user = await get_user_by_id_db(seed.principal.id, db)
+    await delete_user_db(user, db)
+
+
+async def create_comment(seed, db):
+    comment = Comment(message="hello", user_id=seed.principal.id, post_id=seed.post_id)
+    await create_comment_db(comment, db)
+
+
+async def purge(seed, db):
+    for step in purger.steps:
+        await step(100, db)
+
+
+QUERIES = {
+    "feed": lambda seed, db: feed_post_db(20, None, None, db),
+    "feed_next_page": lambda seed, db: feed_post_db(20, seed.after, 3, db),
+    "feed_versions": lambda seed, db: feed_post_versions_db(20, seed.after, db),
+    "my_posts": lambda seed, db: get_all_post_db(seed.principal.id, 20, None, None, db),
+    "my_posts_previews": lambda seed, db: get_all_post_db(
+        seed.principal.id, 20, None, 3, db
+    ),
+    "search": lambda seed, db: search_posts_db("lorem dolor", 20, None, 3, db),
+    "post": lambda seed, db: get_post_by_id_db(seed.post_id, db),
+    "post_ref": lambda seed, db: get_post_ref_db(seed.post_id, db),
+    "post_versions": lambda seed, db: get_post_versions_db(seed.post_id, db),
+    "update_post": lambda seed, db: update_post_db(
+        seed.post_id, {"title": "Updated"}, db
+    ),
+    "delete_post": lambda seed, db: delete_post_db(seed.post_id, db),
+    "comment": lambda seed, db: get_comment_by_id_db(seed.comment_id, db),
+    "my_comments": lambda seed, db: get_my_comments_db(seed.principal, db),
+    "create_comment": create_comment,
+    "delete_comment": lambda seed, db: delete_comment_by_id_db(seed.comment_id, db),
+    "notifications": lambda seed, db: get_all_notification_db(
+        seed.principal, 20, None, db
+    ),
+    "notification_summaries": lambda seed, db: get_notification_summaries_db(
+        seed.principal, 20, None, db
+    ),
+    "notification": lambda seed, db: get_notification_by_id_db(
+        seed.notification_id, db
+    ),
+    "unread_count": lambda seed, db: count_unread_notification_db(seed.principal, db),
+    "mark_read": lambda seed, db: mark_notifications_read_db(seed.principal, None, db),
+    "user": lambda seed, db: get_user_by_id_db(seed.principal.id, db),
+    "username": lambda seed, db: get_user_by_username(seed.principal.username, db),
+    "user_activity": user_activity,
+    "rename_user": rename_user,
+    "delete_user": delete_user,
+    "purge": purge,
+}
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("name", QUERIES)
+async def test_query_uses_indexes(seed, name):
+    async with AsyncSessionLocal() as db:
+        # Seq scans stay possible but are priced out, one still showing up in
+        # a plan means no index can answer that statement
+        await db.execute(text("SET LOCAL enable_seqscan = off"))
+
+        with recorded_statements() as statements:
+            await QUERIES[name](seed, db)
+        assert statements
+
+        conn = await db.connection()
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + statement, parameters
+            )
+            plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            scanned = seq_scans(plan[0]["Plan"])
+            assert not scanned, f"Seq Scan on {scanned} for:\n{statement}"
+
+        # Writes are only planned, never kept
+        await db.rollback()
+
+
+@pytest.mark.anyio
+async def test_foreign_keys_are_indexed(seed):
+    # ON DELETE CASCADE looks up children by the FK column, without an index
+    # leading with it every parent delete scans the child table. Partial
+    # indexes do not count, the cascade also has to find excluded rows
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(
+            """
+            SELECT c.conrelid::regclass::text, a.attname
+            FROM pg_constraint c
+            JOIN pg_attribute a
+              ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+            WHERE c.contype = 'f'
+              AND NOT EXISTS (
+                SELECT 1
+                FROM pg_index i
+                WHERE i.indrelid = c.conrelid
+                  AND i.indkey[0] = c.conkey[1]
+                  AND i.indpred IS NULL
+              )
+            """
+        )
+
+        assert result.all() == []
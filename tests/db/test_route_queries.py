@@ -0,0 +1,95 @@
+from contextlib import contextmanager
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.core.database import engine
+from app.core.security import create_access_token
+from app.main import app
+from app.repositories.user import principal_cache
+
+
+@contextmanager
+def recorded_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+async def client(seed):
+    principal = seed.principal
+    token = create_access_token(
+        {
+            "sub": str(principal.id),
+            "role": principal.role.value,
+            "ver": principal.token_version,
+        }
+    )
+    principal_cache.clear()
+
+    # No lifespan, the background workers stay off
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+        headers={"Authorization": f"Bearer {token}"},
+    ) as client:
+        yield client
+
+
+async def get(client, url, **kwargs) -> tuple[httpx.Response, list[str]]:
+    with recorded_statements() as statements:
+        response = await client.get(url, **kwargs)
+
+    return response, statements
+
+
+def assert_principal_lookup(statement: str):
+    # Auth reads one users row, never the posts and comments behind it
+    assert "FROM users" in statement
+    assert "posts" not in statement and "comments" not in statement
+
+
+@pytest.mark.anyio
+async def test_feed_query_count(client):
+    cold, cold_statements = await get(client, "/api/posts?limit=20")
+    warm, warm_statements = await get(client, "/api/posts?limit=20")
+
+    assert cold.status_code == warm.status_code == 200
+    # ETag versions, post rows, their comments
+    assert len(warm_statements) == 3, warm_statements
+    # A principal cache miss costs exactly one slim lookup
+    assert len(cold_statements) == len(warm_statements) + 1
+    assert_principal_lookup(cold_statements[0])
+
+    not_modified, statements = await get(
+        client, "/api/posts?limit=20", headers={"If-None-Match": warm.headers["ETag"]}
+    )
+    assert not_modified.status_code == 304
+    assert len(statements) == 1, statements
+
+
+@pytest.mark.anyio
+async def test_my_profile_query_count(client):
+    cold, cold_statements = await get(client, "/api/users/me")
+    warm, warm_statements = await get(client, "/api/users/me")
+
+    assert cold.status_code == warm.status_code == 200
+    assert len(cold_statements) == len(warm_statements) + 1
+    assert_principal_lookup(cold_statements[0])
+    # Only this route pays for the activity graph, and only on a changed ETag
+    assert any("comments" in statement for statement in warm_statements)
+
+    not_modified, statements = await get(
+        client, "/api/users/me", headers={"If-None-Match": warm.headers["ETag"]}
+    )
+    assert not_modified.status_code == 304
+    assert len(statements) == 1, statements
@@ -0,0 +1,73 @@
+import statistics
+import time
+
+import pytest
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import selectinload
+
+from app.core.database import AsyncSessionLocal
+from app.models.comment import Comment
+from app.models.post import Post
+from app.repositories.post import (
+    live_comment,
+    live_post,
+    search_posts_db,
+    with_comments,
+)
+
+
+RUNS = 20
+
+
+async def ilike_search(query: str, limit: int, db):
+    # What search would be without the tsvector columns: a substring match on
+    # every post and every comment
+    pattern = f"%{query}%"
+    stmt = (
+        select(Post)
+        .options(selectinload(Post.author))
+        .where(
+            live_post(),
+            or_(
+                Post.title.ilike(pattern),
+                Post.content.ilike(pattern),
+                Post.comments.any(and_(Comment.message.ilike(pattern), live_comment())),
+            ),
+        )
+        .order_by(Post.date_created.desc(), Post.id.desc())
+        .limit(limit + 1)
+    )
+    result = await db.execute(with_comments(stmt, None))
+
+    return result.scalars().all()
+
+
+async def median_latency(search) -> tuple[float, set]:
+    timings = []
+    async with AsyncSessionLocal() as db:
+        found = {post.id for post in await search(db)}
+        for _ in range(RUNS):
+            started_at = time.perf_counter()
+            await search(db)
+            timings.append(time.perf_counter() - started_at)
+
+    return statistics.median(timings), found
+
+
+@pytest.mark.anyio
+async def test_full_text_search_beats_ilike(seed):
+    # Both load the same rows, so the difference is the matching alone. ILIKE
+    # reads every post and comment, its cost grows with the tables while the
+    # GIN lookups only grow with the matches
+    ilike, ilike_found = await median_latency(
+        lambda db: ilike_search(seed.rare_term, 20, db)
+    )
+    full_text, full_text_found = await median_latency(
+        lambda db: search_posts_db(seed.rare_term, 20, None, None, db)
+    )
+
+    assert full_text_found == ilike_found and full_text_found
+    assert full_text < ilike, (
+        f"{seed.rare_term!r}: {full_text * 1000:.2f}ms full text, "
+        f"{ilike * 1000:.2f}ms ILIKE"
+    )
@@ -0,0 +1,59 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.database import AsyncSessionLocal
+from app.models.comment import Comment
+from app.models.post import Post
+from app.repositories.notification import get_notification_by_id_db
+from app.repositories.post import search_posts_db
+
+
+@pytest.mark.anyio
+async def test_notification_of_live_post_and_commenter(seed):
+    async with AsyncSessionLocal() as db:
+        notification = await get_notification_by_id_db(seed.notification_id, db)
+
+    assert notification.id == seed.notification_id
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("hidden", [0, 1], ids=["deleted_post", "deleted_commenter"])
+async def test_notification_hidden_by_soft_delete(seed, hidden):
+    async with AsyncSessionLocal() as db:
+        with pytest.raises(HTTPException) as exc_info:
+            await get_notification_by_id_db(seed.hidden_notification_ids[hidden], db)
+
+    assert exc_info.value.status_code == 404
+
+
+async def add_post(db, user_id, title, comments=()):
+    post = Post(user_id=user_id, title=title, content="Imported")
+    post.comments = [
+        Comment(user_id=commenter_id, message=message)
+        for commenter_id, message in comments
+    ]
+    db.add(post)
+    await db.flush()
+
+    return post.id
+
+
+@pytest.mark.anyio
+async def test_search_ignores_comments_of_deleted_users(seed):
+    live, deleted = seed.principal.id, seed.deleted_user_id
+
+    async with AsyncSessionLocal() as db:
+        plain = await add_post(db, live, "marmalade")
+        # Its only other match comes from a soft-deleted user, the rank must
+        # not move because of it
+        boosted = await add_post(db, live, "marmalade", [(deleted, "marmalade")])
+        only_hidden = await add_post(db, live, "Toast", [(deleted, "marmalade")])
+        commented = await add_post(db, live, "Toast", [(live, "marmalade")])
+
+        posts = await search_posts_db("marmalade", 20, None, None, db)
+        ranks = {post.id: post.search_rank for post in posts}
+        await db.rollback()
+
+    assert set(ranks) == {plain, boosted, commented}
+    assert only_hidden not in ranks
+    assert ranks[boosted] == ranks[plain]
@@ -0,0 +1,173 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+
+from app.core import batch_writer
+from app.core.batch_writer import BatchWriter
+from app.models.notification import Notification
+
+
+class FakeDatabase:
+    """Stands in for AsyncSessionLocal, records the rows of every insert.
+
+    `failures` is consumed one entry per execute: an exception to raise for
+    that call, or None to let it succeed.
+    """
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.batches: list[list[dict]] = []
+
+    def __call__(self):
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, database: FakeDatabase):
+        self.database = database
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def begin(self):
+        return self
+
+    async def execute(self, statement, rows):
+        failure = self.database.failures.pop(0) if self.database.failures else None
+        if failure is not None:
+            raise failure
+        self.database.batches.append(list(rows))
+
+
+def db_error(cls):
+    return cls("INSERT INTO notifications", {}, Exception("boom"))
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(batch_writer, "AsyncSessionLocal", database)
+    return database
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(batch_writer.asyncio, "sleep", sleep)
+    return delays
+
+
+def make_writer(**kwargs) -> BatchWriter:
+    options = {"batch_size": 3, "flush_interval": 60, "max_queue": 100}
+    return BatchWriter(Notification, **(options | kwargs))
+
+
+@pytest.mark.anyio
+async def test_flushes_full_batches(database):
+    writer = make_writer()
+    await writer.start()
+    for i in range(7):
+        writer.enqueue({"i": i})
+    await writer.stop()
+
+    assert [len(batch) for batch in database.batches] == [3, 3, 1]
+    assert writer.stats() == {"queued": 0, "written": 7, "retried": 0, "dropped": 0}
+
+
+@pytest.mark.anyio
+async def test_flushes_partial_batch_after_interval(database):
+    writer = make_writer(flush_interval=0.01)
+    await writer.start()
+    writer.enqueue({"i": 0})
+
+    await asyncio.sleep(0.1)
+    assert database.batches == [[{"i": 0}]]
+
+    await writer.stop()
+
+
+@pytest.mark.anyio
+async def test_retries_transient_errors(database, no_sleep):
+    database.failures = [db_error(OperationalError), db_error(OperationalError)]
+    writer = make_writer(retry_backoff=0.5)
+
+    await writer.write([{"i": 0}, {"i": 1}])
+
+    assert database.batches == [[{"i": 0}, {"i": 1}]]
+    assert no_sleep == [0.5, 1.0]
+    assert (writer.written, writer.retried, writer.dropped) == (2, 2, 0)
+
+
+@pytest.mark.anyio
+async def test_drops_batch_when_retries_run_out(database, no_sleep):
+    database.failures = [db_error(OperationalError)] * 3
+    writer = make_writer(retries=2)
+
+    await writer.write([{"i": 0}, {"i": 1}])
+
+    assert database.batches == []
+    assert (writer.written, writer.retried, writer.dropped) == (0, 2, 2)
+
+
+@pytest.mark.anyio
+async def test_does_not_retry_other_errors(database, no_sleep):
+    database.failures = [db_error(ProgrammingError)]
+    writer = make_writer()
+
+    await writer.write([{"i": 0}])
+
+    assert no_sleep == []
+    assert (writer.written, writer.retried, writer.dropped) == (0, 0, 1)
+
+
+@pytest.mark.anyio
+async def test_integrity_error_saves_remaining_rows(database):
+    database.failures = [db_error(IntegrityError), None, db_error(IntegrityError)]
+    writer = make_writer()
+
+    await writer.write([{"i": 0}, {"i": 1}])
+
+    assert database.batches == [[{"i": 0}]]
+    assert (writer.written, writer.dropped) == (1, 1)
+
+
+@pytest.mark.anyio
+async def test_full_queue_drops_rows(database):
+    writer = make_writer(max_queue=2)
+    for i in range(3):
+        writer.enqueue({"i": i})
+
+    assert writer.dropped == 1
+
+
+@pytest.mark.anyio
+async def test_stop_with_full_queue_writes_everything(database):
+    writer = make_writer(max_queue=4)
+    await writer.start()
+    for i in range(4):
+        writer.enqueue({"i": i})
+
+    # The queue has no room for the sentinel, stop must not wait for one
+    await asyncio.wait_for(writer.stop(), 1)
+
+    assert sum(len(batch) for batch in database.batches) == 4
+    assert writer.dropped == 0
+
+
+@pytest.mark.anyio
+async def test_stop_when_idle(database):
+    writer = make_writer()
+    await writer.start()
+    await asyncio.sleep(0)
+
+    await asyncio.wait_for(writer.stop(), 1)
+
+    assert database.batches == []
@@ -0,0 +1,95 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.user import Role
+from app.schemas.post import PostBulkResponse
+from app.schemas.user import Principal
+from app.services import post as post_service
+
+
+@pytest.fixture
+def user():
+    return Principal(
+        id=uuid.uuid4(),
+        username="ada",
+        first_name="Ada",
+        last_name="Lovelace",
+        role=Role.USER,
+        token_version=0,
+    )
+
+
+@pytest.fixture
+def inserted(monkeypatch):
+    batches = []
+
+    async def create_posts_db(rows, db):
+        batches.append(rows)
+        return [uuid.uuid4() for _ in rows]
+
+    monkeypatch.setattr(post_service, "create_posts_db", create_posts_db)
+    return batches
+
+
+def post(title="Title"):
+    return {"title": title, "content": "Content"}
+
+
+@pytest.mark.anyio
+async def test_valid_items_are_inserted_in_one_batch(user, inserted):
+    result = await post_service.create_posts_bulk_service(
+        [post("a"), post("b")], atomic=False, db=None, current_user=user
+    )
+
+    assert result["created"] == 2
+    assert [row["title"] for row in inserted[0]] == ["a", "b"]
+    assert {row["user_id"] for row in inserted[0]} == {user.id}
+    assert [r["index"] for r in result["results"]] == [0, 1]
+    assert all(r["id"] for r in result["results"])
+    PostBulkResponse.model_validate(result)
+
+
+@pytest.mark.anyio
+async def test_invalid_items_are_reported_in_their_own_slot(user, inserted):
+    items = [post(), {"title": "x" * 101, "content": "c"}, "not an object", post()]
+
+    result = await post_service.create_posts_bulk_service(
+        items, atomic=False, db=None, current_user=user
+    )
+
+    assert result["created"] == 2
+    assert len(inserted[0]) == 2
+    results = result["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert "id" in results[0] and "id" in results[3]
+    assert results[1]["errors"][0]["loc"] == ("title",)
+    assert results[2]["errors"][0]["type"] == "model_type"
+    assert results[0]["id"] != results[3]["id"]
+    PostBulkResponse.model_validate(result)
+
+
+@pytest.mark.anyio
+async def test_nothing_valid_skips_the_insert(user, inserted):
+    result = await post_service.create_posts_bulk_service(
+        [{}, None], atomic=False, db=None, current_user=user
+    )
+
+    assert result["created"] == 0
+    assert inserted == []
+
+
+@pytest.mark.anyio
+async def test_atomic_rejects_the_whole_batch(user, inserted):
+    with pytest.raises(HTTPException) as exc_info:
+        await post_service.create_posts_bulk_service(
+            [post(), {"title": "t"}], atomic=True, db=None, current_user=user
+        )
+
+    assert exc_info.value.status_code == 422
+    detail = exc_info.value.detail
+    assert detail["created"] == 0
+    assert detail["results"][0]["errors"] is None
+    assert detail["results"][1]["errors"][0]["loc"] == ("content",)
+    assert inserted == []
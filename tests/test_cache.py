@@ -0,0 +1,206 @@
+import pytest
+
+from app.core import cache
+from app.core.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_ttl_cache_returns_until_expiry(clock):
+    ttl_cache = TTLCache(maxsize=10, ttl=30)
+    ttl_cache.set("a", 1)
+
+    clock[0] += 30
+    assert ttl_cache.get("a") == 1
+
+    clock[0] += 0.001
+    assert ttl_cache.get("a") is None
+    assert len(ttl_cache) == 0
+
+
+def test_ttl_cache_set_refreshes_expiry(clock):
+    ttl_cache = TTLCache(maxsize=10, ttl=30)
+    ttl_cache.set("a", 1)
+
+    clock[0] += 20
+    ttl_cache.set("a", 2)
+    clock[0] += 20
+
+    assert ttl_cache.get("a") == 2
+
+
+def test_ttl_cache_evicts_least_recently_used(clock):
+    ttl_cache = TTLCache(maxsize=2, ttl=30)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+
+    ttl_cache.get("a")
+    ttl_cache.set("c", 3)
+
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("c") == 3
+
+
+def test_ttl_cache_delete_and_clear(clock):
+    ttl_cache = TTLCache(maxsize=10, ttl=30)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+
+    ttl_cache.delete("a")
+    ttl_cache.delete("missing")
+    assert ttl_cache.get("a") is None
+    assert len(ttl_cache) == 1
+
+    ttl_cache.clear()
+    assert len(ttl_cache) == 0
+
+
+class FailingBackend(cache.MemoryBackend):
+    async def get(self, key):
+        raise ConnectionError("down")
+
+    async def set(self, key, value):
+        raise ConnectionError("down")
+
+
+@pytest.mark.anyio
+async def test_response_cache_serves_only_the_stored_etag():
+    response_cache = cache.ResponseCache(cache.MemoryBackend(maxsize=10, ttl=30))
+    await response_cache.set("post:1", '"v1"', b'{"title": "a"}')
+
+    assert await response_cache.get("post:1", '"v1"') == b'{"title": "a"}'
+    assert await response_cache.get("post:1", '"v2"') is None
+
+    stats = response_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stale"]) == (1, 1, 1)
+
+
+@pytest.mark.anyio
+async def test_response_cache_invalidate():
+    response_cache = cache.ResponseCache(cache.MemoryBackend(maxsize=10, ttl=30))
+    await response_cache.set("post:1", '"v1"', b"{}")
+
+    await response_cache.invalidate("post:1")
+
+    assert await response_cache.get("post:1", '"v1"') is None
+
+
+@pytest.mark.anyio
+async def test_response_cache_backend_errors_are_misses():
+    response_cache = cache.ResponseCache(FailingBackend(maxsize=10, ttl=30))
+
+    await response_cache.set("post:1", '"v1"', b"{}")
+    assert await response_cache.get("post:1", '"v1"') is None
+    assert response_cache.stats()["errors"] == 2
+
+
+@pytest.mark.anyio
+async def test_disabled_response_cache_is_a_no_op():
+    response_cache = cache.ResponseCache(None)
+
+    await response_cache.set("post:1", '"v1"', b"{}")
+    assert await response_cache.get("post:1", '"v1"') is None
+
+
+class FakeRedis:
+    """The part of redis.asyncio.Redis RedisBackend uses, expiring on `clock`."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.data: dict[str, tuple[float, bytes]] = {}
+        self.closed = False
+
+    async def get(self, key):
+        entry = self.data.get(key)
+        if entry is None or entry[0] <= self.clock[0]:
+            return None
+        return entry[1]
+
+    async def set(self, key, value, ex):
+        self.data[key] = (self.clock[0] + ex, value)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan_iter(self, match):
+        for key in list(self.data):
+            if key.startswith(match.removesuffix("*")):
+                yield key
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_redis(monkeypatch, clock):
+    client = FakeRedis(clock)
+    monkeypatch.setattr(
+        cache, "redis", type("redis", (), {"from_url": lambda url: client})
+    )
+    return client
+
+
+@pytest.mark.anyio
+async def test_redis_backend_get_set_under_prefix(fake_redis):
+    backend = cache.RedisBackend("redis://localhost", ttl=30)
+
+    await backend.set("post:1", b"body")
+
+    assert await backend.get("post:1") == b"body"
+    assert list(fake_redis.data) == ["blog-api:post:1"]
+
+
+@pytest.mark.anyio
+async def test_redis_backend_entries_expire(fake_redis, clock):
+    backend = cache.RedisBackend("redis://localhost", ttl=30.9)
+
+    await backend.set("post:1", b"body")
+
+    # Redis takes whole seconds, the TTL is rounded down
+    clock[0] += 29.9
+    assert await backend.get("post:1") == b"body"
+    clock[0] += 0.1
+    assert await backend.get("post:1") is None
+
+
+@pytest.mark.anyio
+async def test_redis_backend_delete_and_clear_own_keys(fake_redis):
+    backend = cache.RedisBackend("redis://localhost", ttl=30)
+    await fake_redis.set("other-app:post:1", b"theirs", ex=30)
+    for key in ("post:1", "post:2", "post:3"):
+        await backend.set(key, b"body")
+
+    await backend.delete("post:1", "post:2")
+    assert await backend.get("post:1") is None
+    assert await backend.get("post:3") == b"body"
+
+    await backend.clear()
+    assert list(fake_redis.data) == ["other-app:post:1"]
+
+    await backend.close()
+    assert fake_redis.closed
+
+
+@pytest.mark.anyio
+async def test_response_cache_over_redis_backend(fake_redis):
+    response_cache = cache.ResponseCache(cache.RedisBackend("redis://x", ttl=30))
+
+    await response_cache.set("post:1", '"v1"', b"{}")
+    assert await response_cache.get("post:1", '"v1"') == b"{}"
+
+    await response_cache.invalidate("post:1")
+    assert await response_cache.get("post:1", '"v1"') is None
+
+
+def test_redis_backend_needs_the_redis_package(monkeypatch):
+    monkeypatch.setattr(cache, "redis", None)
+
+    with pytest.raises(RuntimeError):
+        cache.RedisBackend("redis://localhost", ttl=30)
@@ -0,0 +1,55 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from starlette.requests import Request
+
+from app.core.etag import etag_matches, make_etag, not_modified
+
+
+def request_with(if_none_match: str | None) -> Request:
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+def test_make_etag_depends_only_on_its_parts():
+    id = uuid.uuid4()
+    updated_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    assert make_etag(id, 3, updated_at) == make_etag(id, 3, updated_at)
+    assert make_etag(id, 3, updated_at) != make_etag(id, 4, updated_at)
+
+
+def test_make_etag_is_a_quoted_strong_tag():
+    etag = make_etag(1)
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert not etag.startswith("W/")
+
+
+@pytest.mark.parametrize(
+    "header, matches",
+    [
+        (None, False),
+        ("", False),
+        ('"abc"', True),
+        ('"xyz"', False),
+        ("*", True),
+        (' "xyz" , "abc" ', True),
+        ('W/"abc"', True),
+        ('"xyz", W/"abc"', True),
+        ('"abc-gzip"', False),
+    ],
+)
+def test_etag_matches(header, matches):
+    assert etag_matches(request_with(header), '"abc"') is matches
+
+
+def test_not_modified_keeps_validators():
+    response = not_modified('"abc"')
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == '"abc"'
+    assert response.headers["Cache-Control"] == "private, no-cache"
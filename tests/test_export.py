@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from app.core.export import csv_chunks, ndjson_chunks
+
+
+async def partitions(*parts):
+    for rows in parts:
+        yield rows
+
+
+async def collect(chunks) -> list[bytes]:
+    return [chunk async for chunk in chunks]
+
+
+def flatten(row):
+    return [row["id"], row["body"]]
+
+
+@pytest.mark.anyio
+async def test_csv_chunks_one_chunk_per_partition():
+    chunks = await collect(
+        csv_chunks(
+            partitions([{"id": 1, "body": "a"}], [{"id": 2, "body": "b"}]),
+            header=["id", "body"],
+            flatten=flatten,
+        )
+    )
+
+    assert chunks == [b"id,body\r\n1,a\r\n", b"2,b\r\n"]
+
+
+@pytest.mark.anyio
+async def test_csv_chunks_quotes_values():
+    chunks = await collect(
+        csv_chunks(
+            partitions([{"id": 1, "body": 'say "hi",\nbye'}]),
+            header=["id", "body"],
+            flatten=flatten,
+        )
+    )
+
+    assert b"".join(chunks) == b'id,body\r\n1,"say ""hi"",\nbye"\r\n'
+
+
+@pytest.mark.anyio
+async def test_csv_chunks_without_rows_still_has_header():
+    chunks = await collect(csv_chunks(partitions(), ["id", "body"], flatten))
+
+    assert chunks == [b"id,body\r\n"]
+
+
+@pytest.mark.anyio
+async def test_ndjson_chunks_one_line_per_row():
+    chunks = await collect(
+        ndjson_chunks(partitions([{"id": 1}, {"id": 2}], [{"id": 3}]), json.dumps)
+    )
+
+    assert chunks == [b'{"id": 1}\n{"id": 2}\n', b'{"id": 3}\n']
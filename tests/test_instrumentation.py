@@ -0,0 +1,49 @@
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI, Request
+
+from app.core.instrumentation import route_name
+
+
+@pytest.fixture
+async def client():
+    router = APIRouter()
+
+    @router.get("")
+    async def list_items(request: Request):
+        return route_name(request.scope)
+
+    @router.get("/{item_id}/comments/{comment_id}")
+    async def get_comment(item_id: str, comment_id: str, request: Request):
+        return route_name(request.scope)
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/items")
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "url, name",
+    [
+        ("/api/items", "GET /api/items"),
+        ("/api/items/1/comments/1", "GET /api/items/{item_id}/comments/{comment_id}"),
+        # A parameter value that also appears in the prefix stays in place
+        (
+            "/api/items/items/comments/api",
+            "GET /api/items/{item_id}/comments/{comment_id}",
+        ),
+    ],
+)
+async def test_route_name_uses_the_route_template(client, url, name):
+    response = await client.get(url)
+
+    assert response.json() == name
+
+
+def test_unmatched_request():
+    assert route_name({"method": "GET", "path": "/nowhere"}) == "GET <unmatched>"
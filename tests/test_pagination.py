@@ -0,0 +1,72 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import (
+    decode_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    paginate,
+)
+
+
+def test_cursor_round_trip():
+    date_created = datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    id = uuid.uuid4()
+
+    assert decode_cursor(encode_cursor(date_created, id)) == (date_created, id)
+
+
+def test_rank_cursor_round_trip():
+    id = uuid.uuid4()
+
+    assert decode_rank_cursor(encode_cursor(0.0607927, id)) == (0.0607927, id)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        "bm90IGpzb24=",  # "not json"
+        "WzFd",  # [1]
+        "WyJ5ZXN0ZXJkYXkiLCAieCJd",  # ["yesterday", "x"]
+    ],
+)
+def test_invalid_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor)
+
+    assert exc_info.value.status_code == 400
+
+
+def test_paginate_last_page_has_no_cursor():
+    rows = [{"id": uuid.uuid4(), "date_created": datetime.now(timezone.utc)}]
+
+    page = paginate(rows, limit=2)
+
+    assert page == {"items": rows, "next_cursor": None}
+
+
+def test_paginate_cursor_points_at_last_item():
+    now = datetime.now(timezone.utc)
+    rows = [{"id": uuid.uuid4(), "date_created": now} for _ in range(3)]
+
+    page = paginate(rows, limit=2)
+
+    assert page["items"] == rows[:2]
+    assert decode_cursor(page["next_cursor"]) == (now, rows[1]["id"])
+
+
+def test_paginate_reads_attributes_and_custom_sort_key():
+    class Row:
+        def __init__(self, rank):
+            self.id = uuid.uuid4()
+            self.search_rank = rank
+
+    rows = [Row(0.9), Row(0.5), Row(0.1)]
+
+    page = paginate(rows, limit=2, sort_key="search_rank")
+
+    assert decode_rank_cursor(page["next_cursor"]) == (0.5, rows[1].id)
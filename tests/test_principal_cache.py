@@ -0,0 +1,129 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.security import create_access_token
+from app.models.user import Role
+from app.repositories import user as user_repository
+from app.repositories.user import get_current_user, principal_cache
+
+
+class FakeDatabase:
+    """Stands in for AsyncSessionLocal, serves `row` to the principal lookup."""
+
+    def __init__(self):
+        self.row = None
+        self.lookups = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, statement):
+        self.lookups += 1
+        return SimpleNamespace(first=lambda: self.row)
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(user_repository, "AsyncSessionLocal", database)
+    principal_cache.clear()
+    yield database
+    principal_cache.clear()
+
+
+@pytest.fixture
+def user(database):
+    database.row = SimpleNamespace(
+        id=uuid.uuid4(),
+        username="ada.lovelace",
+        first_name="Ada",
+        last_name="Lovelace",
+        role=Role.USER,
+        token_version=0,
+    )
+    return database.row
+
+
+def token_for(user, **claims) -> str:
+    return create_access_token(
+        {"sub": str(user.id), "role": user.role.value, "ver": user.token_version}
+        | claims
+    )
+
+
+@pytest.mark.anyio
+async def test_cache_hit_skips_the_database(database, user):
+    token = token_for(user)
+
+    first = await get_current_user(token)
+    second = await get_current_user(token)
+
+    assert database.lookups == 1
+    assert second == first
+    assert (first.id, first.role, first.token_version) == (user.id, Role.USER, 0)
+
+
+@pytest.mark.anyio
+async def test_newer_token_version_reloads_the_principal(database, user):
+    await get_current_user(token_for(user))
+
+    # Password changed elsewhere, the new token carries the next version
+    user.token_version = 1
+    principal = await get_current_user(token_for(user))
+
+    assert database.lookups == 2
+    assert principal.token_version == 1
+    assert principal_cache.get(user.id).token_version == 1
+
+
+@pytest.mark.anyio
+async def test_revoked_token_version_is_rejected(database, user):
+    old_token = token_for(user)
+    await get_current_user(old_token)
+
+    user.token_version = 1
+    await get_current_user(token_for(user))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user(old_token)
+
+    assert exc_info.value.status_code == 401
+    assert database.lookups == 3
+
+
+@pytest.mark.anyio
+async def test_role_claim_must_match_the_database(database, user):
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user(token_for(user, role=Role.ADMIN.value))
+
+    assert exc_info.value.status_code == 401
+    assert principal_cache.get(user.id) is None
+
+
+@pytest.mark.anyio
+async def test_cached_principal_keeps_its_own_role(database, user):
+    await get_current_user(token_for(user))
+
+    # The role claim is not trusted on a cache hit either
+    principal = await get_current_user(token_for(user, role=Role.ADMIN.value))
+
+    assert principal.role == Role.USER
+
+
+@pytest.mark.anyio
+async def test_deleted_user_is_rejected(database, user):
+    database.row = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user(token_for(user))
+
+    assert exc_info.value.status_code == 401
@@ -0,0 +1,71 @@
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.responses import JSONResponse
+
+from app.core.responses import OrjsonResponse
+from app.schemas.post import PostPage
+
+pytest.importorskip("orjson")
+
+
+POSTS = 1000
+COMMENTS = 3
+RUNS = 20
+
+
+def large_feed_page() -> dict:
+    # What FastAPI hands the response class for a full feed page: the
+    # response_model already dumped to JSON types
+    now = datetime.now(timezone.utc)
+    author = {"first_name": "Zoë", "last_name": "Łukasiewicz"}
+    page = PostPage(
+        items=[
+            {
+                "id": uuid.uuid4(),
+                "title": f"Post {i}",
+                "content": "Lorem ipsum dolor sit amet, consectetur. " * 20,
+                "date_created": now - timedelta(minutes=i),
+                "author": author,
+                "comments": [
+                    {"id": uuid.uuid4(), "message": "Nice post ✓", "author": author}
+                    for _ in range(COMMENTS)
+                ],
+                "comment_count": COMMENTS,
+            }
+            for i in range(POSTS)
+        ],
+        next_cursor="WyIyMDI2LTAxLTAxVDAwOjAwOjAwKzAwOjAwIiwgIngiXQ==",
+    )
+
+    return page.model_dump(mode="json")
+
+
+def median_render_time(response_class, content) -> float:
+    timings = []
+    for _ in range(RUNS):
+        started_at = time.perf_counter()
+        response_class(content)
+        timings.append(time.perf_counter() - started_at)
+
+    return statistics.median(timings)
+
+
+def test_orjson_renders_the_same_bytes():
+    content = large_feed_page()
+
+    assert OrjsonResponse(content).body == JSONResponse(content).body
+
+
+def test_orjson_renders_large_feed_page_faster():
+    content = large_feed_page()
+
+    default = median_render_time(JSONResponse, content)
+    fast = median_render_time(OrjsonResponse, content)
+
+    assert (
+        fast < default
+    ), f"{POSTS} posts: {fast * 1000:.2f}ms orjson, {default * 1000:.2f}ms json"
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.settings import settings
+
+
+@pytest.fixture
+def hashing_pool(monkeypatch):
+    monkeypatch.setattr(settings, "HASHING_EXECUTOR", "thread")
+    monkeypatch.setattr(settings, "HASHING_WORKERS", 1)
+    monkeypatch.setattr(settings, "HASHING_QUEUE_SIZE", 1)
+    monkeypatch.setattr(
+        security, "hashing_stats", dict.fromkeys(security.hashing_stats, 0)
+    )
+
+    security.start_hashing_pool()
+    yield security.hashing_stats
+    security.shutdown_hashing_pool()
+
+
+@pytest.fixture
+def release(hashing_pool):
+    # Set before the pool shuts down, even when a test fails midway
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+async def wait_for_in_flight(stats: dict, count: int):
+    while stats["in_flight"] < count:
+        await asyncio.sleep(0.001)
+
+
+@pytest.mark.anyio
+async def test_full_pool_rejects_with_503(hashing_pool, release):
+    # One running on the single worker, one waiting in the queue
+    running = [
+        asyncio.create_task(security.run_hashing(release.wait)) for _ in range(2)
+    ]
+    await asyncio.wait_for(wait_for_in_flight(hashing_pool, 2), 1)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await security.run_hashing(release.wait)
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "1"
+
+    release.set()
+    assert await asyncio.gather(*running) == [True, True]
+    assert hashing_pool["in_flight"] == 0
+    assert hashing_pool["rejected"] == 1
+    assert hashing_pool["completed"] == 2
+
+
+@pytest.mark.anyio
+async def test_in_flight_is_released_when_fn_raises(hashing_pool):
+    def fail():
+        raise ValueError("bad hash")
+
+    with pytest.raises(ValueError):
+        await security.run_hashing(fail)
+
+    assert hashing_pool["in_flight"] == 0
+    assert hashing_pool["completed"] == 0
+
+    # The slot is free again
+    assert await security.run_hashing(lambda: "ok") == "ok"
+    assert hashing_pool["completed"] == 1